@@ -4,17 +4,22 @@ Extracts pitch, jitter, shimmer, and other voice quality metrics.
 """
 
 import logging
-from pathlib import Path
-from typing import NamedTuple
+import time
+from typing import Any, Callable, NamedTuple
 
 import numpy as np
 import parselmouth
 from parselmouth.praat import call
 
 from app.models import AudioMetrics
+from app.analysis.audio import AudioBuffer
 
 logger = logging.getLogger(__name__)
 
+# Pitch search range for speech (Hz), shared by every pitch-based object
+PITCH_FLOOR = 75
+PITCH_CEILING = 500
+
 
 class VoiceQualityMetrics(NamedTuple):
     """Raw voice quality measurements."""
@@ -29,21 +34,86 @@ class VoiceQualityMetrics(NamedTuple):
     harmonics_to_noise_ratio: float
 
 
-def extract_pitch_features(sound: parselmouth.Sound) -> tuple[float, float, float, float]:
+class AcousticContext:
+    """
+    Lazily built Praat analysis objects for one Sound.
+    
+    Each object (Pitch, PointProcess, Harmonicity, ...) is built on first
+    access, memoized, and shared by every metric extractor, so pitch
+    tracking runs once per request. Build times are recorded per object.
+    New objects plug in by registering a builder:
+    
+        @AcousticContext.register("intensity")
+        def _build_intensity(ctx):
+            return call(ctx.sound, "To Intensity", PITCH_FLOOR, 0.0)
+    """
+    
+    _builders: dict[str, Callable[["AcousticContext"], Any]] = {}
+    
+    def __init__(self, sound: parselmouth.Sound):
+        self.sound = sound
+        self.build_times: dict[str, float] = {}
+        self._objects: dict[str, Any] = {}
+    
+    @classmethod
+    def register(cls, name: str) -> Callable:
+        """Decorator registering a builder for a named analysis object."""
+        def decorator(builder: Callable[["AcousticContext"], Any]) -> Callable:
+            cls._builders[name] = builder
+            return builder
+        return decorator
+    
+    def get(self, name: str) -> Any:
+        """Get a named analysis object, building it on first access."""
+        if name not in self._objects:
+            start = time.perf_counter()
+            self._objects[name] = self._builders[name](self)
+            self.build_times[name] = time.perf_counter() - start
+        return self._objects[name]
+    
+    @property
+    def pitch(self) -> parselmouth.Pitch:
+        return self.get("pitch")
+    
+    @property
+    def point_process(self):
+        return self.get("point_process")
+    
+    @property
+    def harmonicity(self) -> parselmouth.Harmonicity:
+        return self.get("harmonicity")
+
+
+@AcousticContext.register("pitch")
+def _build_pitch(ctx: AcousticContext) -> parselmouth.Pitch:
+    # time_step=0 (auto), floor/ceiling for speech
+    return call(ctx.sound, "To Pitch", 0.0, PITCH_FLOOR, PITCH_CEILING)
+
+
+@AcousticContext.register("point_process")
+def _build_point_process(ctx: AcousticContext):
+    # Same result as "To PointProcess (periodic, cc)" with this pitch range,
+    # which would otherwise run its own pitch analysis internally
+    return call([ctx.sound, ctx.pitch], "To PointProcess (cc)")
+
+
+@AcousticContext.register("harmonicity")
+def _build_harmonicity(ctx: AcousticContext) -> parselmouth.Harmonicity:
+    return call(ctx.sound, "To Harmonicity (cc)", 0.01, PITCH_FLOOR, 0.1, 1.0)
+
+
+def extract_pitch_features(ctx: AcousticContext) -> tuple[float, float, float, float]:
     """
     Extract pitch (F0) features from audio.
     
     Args:
-        sound: Parselmouth Sound object.
+        ctx: Acoustic analysis context for the sound.
         
     Returns:
         Tuple of (mean, std, min, max) pitch values in Hz.
     """
-    # Create pitch object with appropriate settings for speech
-    pitch = call(sound, "To Pitch", 0.0, 75, 500)  # time_step=0, min=75Hz, max=500Hz
-    
     # Get pitch values
-    pitch_values = pitch.selected_array["frequency"]
+    pitch_values = ctx.pitch.selected_array["frequency"]
     
     # Filter out unvoiced frames (0 values)
     voiced_pitch = pitch_values[pitch_values > 0]
@@ -60,21 +130,20 @@ def extract_pitch_features(sound: parselmouth.Sound) -> tuple[float, float, floa
     )
 
 
-def extract_voice_quality(sound: parselmouth.Sound) -> VoiceQualityMetrics:
+def extract_voice_quality(ctx: AcousticContext) -> VoiceQualityMetrics:
     """
     Extract jitter, shimmer, and HNR using Praat's PointProcess.
     
     Args:
-        sound: Parselmouth Sound object.
+        ctx: Acoustic analysis context for the sound.
         
     Returns:
         VoiceQualityMetrics with all voice quality measurements.
     """
-    # Create pitch object
-    pitch = call(sound, "To Pitch", 0.0, 75, 500)
+    sound = ctx.sound
     
-    # Create PointProcess (pulses) from pitch
-    point_process = call(sound, "To PointProcess (periodic, cc)", 75, 500)
+    # PointProcess (pulses) derived from the shared pitch track
+    point_process = ctx.point_process
     
     # Get time range
     start_time = sound.xmin
@@ -102,8 +171,7 @@ def extract_voice_quality(sound: parselmouth.Sound) -> VoiceQualityMetrics:
     
     # Extract Harmonics-to-Noise Ratio
     try:
-        harmonicity = call(sound, "To Harmonicity (cc)", 0.01, 75, 0.1, 1.0)
-        hnr = call(harmonicity, "Get mean", 0, 0)
+        hnr = call(ctx.harmonicity, "Get mean", 0, 0)
     except Exception as e:
         logger.warning(f"HNR extraction failed: {e}")
         hnr = 0.0
@@ -125,27 +193,29 @@ def extract_voice_quality(sound: parselmouth.Sound) -> VoiceQualityMetrics:
     )
 
 
-def analyze_acoustics(audio_path: Path) -> AudioMetrics:
+def analyze_acoustics(audio: AudioBuffer) -> AudioMetrics:
     """
-    Perform complete acoustic analysis on audio file.
+    Perform complete acoustic analysis on decoded audio.
     
     Args:
-        audio_path: Path to the audio file.
+        audio: Decoded audio buffer.
         
     Returns:
         AudioMetrics with all acoustic measurements.
     """
-    logger.info(f"Analyzing acoustics: {audio_path}")
+    logger.info("Analyzing acoustics")
     
-    # Load audio with Parselmouth
-    sound = parselmouth.Sound(str(audio_path))
+    # Wrap the decoded samples in a Parselmouth Sound; Praat objects are shared
+    ctx = AcousticContext(audio.to_sound())
     
     # Extract pitch features
-    pitch_mean, pitch_std, pitch_min, pitch_max = extract_pitch_features(sound)
+    pitch_mean, pitch_std, pitch_min, pitch_max = extract_pitch_features(ctx)
     
     # Extract voice quality metrics
-    voice_quality = extract_voice_quality(sound)
+    voice_quality = extract_voice_quality(ctx)
     
+    build_summary = ", ".join(f"{name}={seconds:.2f}s" for name, seconds in ctx.build_times.items())
+    logger.info(f"Praat objects built: {build_summary}")
     logger.info(f"Acoustic analysis complete - Pitch: {pitch_mean:.1f}Hz, Jitter: {voice_quality.jitter_local:.2f}%")
     
     return AudioMetrics(
@@ -0,0 +1,84 @@
+"""
+Shared Audio Buffer
+Decodes an upload once and serves it to every analysis stage.
+"""
+
+import logging
+from pathlib import Path
+
+import librosa
+import numpy as np
+import parselmouth
+
+logger = logging.getLogger(__name__)
+
+# Whisper expects 16 kHz mono float32 input
+WHISPER_SAMPLE_RATE = 16000
+
+
+class AudioBuffer:
+    """
+    Decoded mono audio held in memory.
+
+    The file is decoded once at its native sample rate. Resampled
+    variants are computed on first request and cached, so Whisper,
+    Parselmouth and librosa all read from the same decoded samples
+    instead of opening the file again.
+    """
+
+    def __init__(self, samples: np.ndarray, sample_rate: int):
+        """
+        Initialize the audio buffer.
+
+        Args:
+            samples: Mono waveform as a 1-D float array.
+            sample_rate: Sample rate of `samples` in Hz.
+        """
+        self.samples = np.ascontiguousarray(samples, dtype=np.float32)
+        self.sample_rate = int(sample_rate)
+        self._variants: dict[int, np.ndarray] = {self.sample_rate: self.samples}
+
+    @classmethod
+    def load(cls, audio_path: Path) -> "AudioBuffer":
+        """
+        Decode an audio file (WAV or MP3) into memory.
+
+        Args:
+            audio_path: Path to the audio file.
+
+        Returns:
+            AudioBuffer at the file's native sample rate.
+        """
+        logger.info(f"Decoding audio: {audio_path}")
+        y, sr = librosa.load(str(audio_path), sr=None, mono=True)
+        return cls(y, sr)
+
+    @property
+    def duration(self) -> float:
+        """Audio duration in seconds."""
+        return len(self.samples) / self.sample_rate if self.sample_rate else 0.0
+
+    def at_rate(self, sample_rate: int) -> np.ndarray:
+        """
+        Get the waveform resampled to a given rate.
+
+        Args:
+            sample_rate: Target sample rate in Hz.
+
+        Returns:
+            Float32 waveform at `sample_rate`. Cached after the first call.
+        """
+        if sample_rate not in self._variants:
+            self._variants[sample_rate] = np.ascontiguousarray(
+                librosa.resample(self.samples, orig_sr=self.sample_rate, target_sr=sample_rate),
+                dtype=np.float32
+            )
+        return self._variants[sample_rate]
+
+    def for_whisper(self) -> np.ndarray:
+        """Get the 16 kHz waveform Whisper accepts in place of a file path."""
+        return self.at_rate(WHISPER_SAMPLE_RATE)
+
+    def to_sound(self) -> parselmouth.Sound:
+        """Build a Parselmouth Sound from the native-rate samples."""
+        return parselmouth.Sound(self.samples.astype(np.float64), sampling_frequency=self.sample_rate)
@@ -0,0 +1,130 @@
+"""
+Encoder Micro-Batching
+Combines Whisper encoder calls from concurrent requests into batched forward passes.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, NamedTuple
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+class _EncodeRequest(NamedTuple):
+    mel: torch.Tensor
+    future: Future
+    submitted: float
+
+
+class BatchedEncoder(torch.nn.Module):
+    """
+    Drop-in replacement for a Whisper audio encoder that batches callers.
+
+    Calls from any thread are queued and a single batching thread runs
+    them through the wrapped encoder together: a batch is sent as soon as
+    it holds `max_batch_size` mel windows, or `max_wait_ms` after its first
+    window arrived. Each caller blocks until its slice of the output is
+    ready. Installing one BatchedEncoder on several model replicas lets
+    their concurrent requests share encoder batches.
+    """
+
+    def __init__(
+        self,
+        encoder: torch.nn.Module,
+        max_batch_size: int = 4,
+        max_wait_ms: float = 10.0,
+        num_threads: int = 0
+    ):
+        super().__init__()
+        self.encoder = encoder
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_wait = max_wait_ms / 1000
+        self.num_threads = num_threads
+
+        self._requests: queue.Queue[_EncodeRequest] = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._windows = 0
+        self._queue_seconds = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="encoder-batcher", daemon=True)
+        self._thread.start()
+
+    def forward(self, mel: torch.Tensor) -> torch.Tensor:
+        """Encode `mel` (batch, n_mels, frames) as part of the next batch."""
+        future: Future = Future()
+        self._requests.put(_EncodeRequest(mel, future, time.perf_counter()))
+        return future.result()
+
+    def _collect(self) -> list[_EncodeRequest]:
+        """Block for one request, then gather more until the batch is full or the wait expires."""
+        batch = [self._requests.get()]
+        windows = batch[0].mel.shape[0]
+        deadline = time.perf_counter() + self.max_wait
+
+        while windows < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            windows += request.mel.shape[0]
+
+        return batch
+
+    def _encode(self, requests: list[_EncodeRequest]) -> None:
+        """Run same-shaped requests as one forward pass and hand out the slices."""
+        started = time.perf_counter()
+        try:
+            with torch.no_grad():
+                features = self.encoder(torch.cat([request.mel for request in requests]))
+        except Exception as e:
+            for request in requests:
+                request.future.set_exception(e)
+            return
+
+        offset = 0
+        for request in requests:
+            size = request.mel.shape[0]
+            request.future.set_result(features[offset:offset + size])
+            offset += size
+
+        with self._stats_lock:
+            self._batches += 1
+            self._windows += offset
+            self._queue_seconds += sum(started - request.submitted for request in requests)
+
+    def _run(self) -> None:
+        if self.num_threads > 0:
+            torch.set_num_threads(self.num_threads)
+
+        while True:
+            batch = self._collect()
+
+            # Whisper pads every window to 30 s, but never concatenate mismatched shapes
+            groups: dict[tuple, list[_EncodeRequest]] = {}
+            for request in batch:
+                groups.setdefault((request.mel.shape[1:], request.mel.dtype), []).append(request)
+
+            for requests in groups.values():
+                self._encode(requests)
+
+    def stats(self) -> dict[str, Any]:
+        """Batch count, mean batch size and mean time windows spent queued."""
+        with self._stats_lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "batches": self._batches,
+                "windows": self._windows,
+                "avg_batch_size": round(self._windows / self._batches, 2) if self._batches else 0.0,
+                "avg_queue_ms": round(self._queue_seconds / self._windows * 1000, 2) if self._windows else 0.0,
+            }
@@ -0,0 +1,188 @@
+"""
+Stage Graph Scheduler
+Runs analysis stages concurrently according to their declared inputs.
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import AbstractContextManager, nullcontext
+from typing import Any, Callable, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+
+class Stage(NamedTuple):
+    """A pipeline stage: `func(*inputs)` produces `output`."""
+    name: str
+    func: Callable[..., Any]
+    inputs: tuple[str, ...]
+    output: str
+
+
+class StageTiming(NamedTuple):
+    """Wall-clock timing of one stage, relative to the start of the run."""
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class GraphRun(NamedTuple):
+    """Outputs and timings of a completed graph run."""
+    values: dict[str, Any]
+    timings: dict[str, StageTiming]
+    critical_path: list[str]
+    critical_path_seconds: float
+    wall_time: float
+
+
+class StageGraph:
+    """
+    Dependency graph of pipeline stages.
+
+    A stage becomes ready as soon as every value it declares as input is
+    available, either from the initial values or from an upstream stage.
+    Ready stages run in parallel on a thread pool; the stages share
+    in-memory inputs such as the decoded audio buffer, which is why threads
+    are used rather than processes.
+    """
+
+    def __init__(self, stages: list[Stage]):
+        """
+        Initialize the graph.
+
+        Args:
+            stages: Stages in any order. Each output name must be unique.
+
+        Raises:
+            ValueError: If an output is produced twice or the graph has a cycle.
+        """
+        self.stages = {stage.name: stage for stage in stages}
+        self._producers: dict[str, str] = {}
+
+        for stage in stages:
+            if stage.output in self._producers:
+                raise ValueError(f"Output '{stage.output}' produced by both '{self._producers[stage.output]}' and '{stage.name}'")
+            self._producers[stage.output] = stage.name
+
+        self.order = self._topological_order()
+
+    def upstream(self, name: str) -> list[str]:
+        """Names of the stages whose outputs `name` consumes."""
+        return [self._producers[key] for key in self.stages[name].inputs if key in self._producers]
+
+    def _topological_order(self) -> list[str]:
+        order: list[str] = []
+        remaining = dict(self.stages)
+
+        while remaining:
+            ready = [name for name in remaining if all(dep in order for dep in self.upstream(name))]
+            if not ready:
+                raise ValueError(f"Stage graph has a cycle among: {sorted(remaining)}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+
+        return order
+
+    def _critical_path(self, timings: dict[str, StageTiming]) -> tuple[list[str], float]:
+        """Longest chain of dependent stages, weighted by stage duration."""
+        cost: dict[str, float] = {}
+        previous: dict[str, str | None] = {}
+
+        for name in self.order:
+            deps = self.upstream(name)
+            best = max(deps, key=lambda dep: cost[dep], default=None)
+            duration = timings[name].duration if name in timings else 0.0
+            cost[name] = duration + (cost[best] if best else 0.0)
+            previous[name] = best
+
+        if not cost:
+            return [], 0.0
+
+        node: str | None = max(cost, key=cost.get)
+        total = cost[node]
+        path = []
+        while node is not None:
+            path.append(node)
+            node = previous[node]
+
+        return path[::-1], total
+
+    def run(
+        self,
+        initial: dict[str, Any],
+        max_workers: int = 1,
+        on_stage: Callable[[str], None] | None = None,
+        stage_context: Callable[[], AbstractContextManager] | None = None
+    ) -> GraphRun:
+        """
+        Execute every stage.
+
+        Stages whose output is already present in `initial` are skipped.
+
+        Args:
+            initial: Values available before any stage runs.
+            max_workers: Maximum stages running at once (1 runs sequentially).
+            on_stage: Optional callback invoked with each stage name as it starts.
+            stage_context: Optional factory for a context manager entered
+                around each stage on the thread that runs it.
+
+        Returns:
+            GraphRun with all values, per-stage timings and the critical path.
+
+        Raises:
+            KeyError: If a stage input is never produced.
+            Exception: The first exception raised by a stage.
+        """
+        for stage in self.stages.values():
+            missing = [key for key in stage.inputs if key not in initial and key not in self._producers]
+            if missing:
+                raise KeyError(f"Stage '{stage.name}' has unsatisfied inputs: {missing}")
+
+        values = dict(initial)
+        timings: dict[str, StageTiming] = {}
+        pending = [name for name in self.order if self.stages[name].output not in initial]
+        running: dict[Future, str] = {}
+        started_at = time.perf_counter()
+
+        def execute(stage: Stage) -> Any:
+            start = time.perf_counter() - started_at
+            logger.info(f"Stage started: {stage.name}")
+            if on_stage is not None:
+                on_stage(stage.name)
+            with stage_context() if stage_context is not None else nullcontext():
+                output = stage.func(*(values[key] for key in stage.inputs))
+            timings[stage.name] = StageTiming(start, time.perf_counter() - started_at)
+            return output
+
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1), thread_name_prefix="stage") as pool:
+            while pending or running:
+                for name in [name for name in pending if all(key in values for key in self.stages[name].inputs)]:
+                    pending.remove(name)
+                    running[pool.submit(execute, self.stages[name])] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        values[self.stages[name].output] = future.result()
+                    except Exception:
+                        for other in running:
+                            other.cancel()
+                        logger.error(f"Stage failed: {name}")
+                        raise
+
+        wall_time = time.perf_counter() - started_at
+        critical_path, critical_seconds = self._critical_path(timings)
+
+        return GraphRun(
+            values=values,
+            timings=timings,
+            critical_path=critical_path,
+            critical_path_seconds=critical_seconds,
+            wall_time=wall_time
+        )
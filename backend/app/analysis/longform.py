@@ -0,0 +1,194 @@
+"""
+Long-Form Transcription
+Splits long recordings at pauses and transcribes the chunks in parallel worker processes.
+"""
+
+import logging
+import multiprocessing
+import multiprocessing.util
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from app.config import get_settings
+from app.analysis.audio import AudioBuffer, WHISPER_SAMPLE_RATE
+from app.analysis.pauses import detect_pauses_librosa
+from app.analysis.transcription import TranscriptionResult, get_transcriber_pool, use_single_replica
+
+logger = logging.getLogger(__name__)
+
+
+def _init_chunk_worker(num_threads: int) -> None:
+    """Chunk worker initializer: split the cores between workers and load the model."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    import torch
+    torch.set_num_threads(num_threads)
+    use_single_replica()
+    get_transcriber_pool().load()
+
+
+def _chunk_worker_ready() -> None:
+    """Completes once a chunk worker has loaded the model."""
+
+
+def _transcribe_chunk(samples: np.ndarray) -> dict:
+    """Transcribe one chunk inside a worker, returning the raw Whisper result."""
+    with get_transcriber_pool().checkout() as backend:
+        return backend.transcribe(samples)
+
+
+@lru_cache
+def get_longform_executor() -> ProcessPoolExecutor:
+    """
+    Get this process's pool for chunk transcription.
+
+    Every pipeline process (each pipeline worker, or the API process in
+    thread mode) owns one of these pools, so the cores are divided among
+    `max(pipeline_workers, 1) * longform_workers` chunk workers.
+    """
+    settings = get_settings()
+    workers = settings.longform_workers
+    num_threads = max(1, (os.cpu_count() or 1) // (max(settings.pipeline_workers, 1) * workers))
+    logger.info(f"Starting {workers} long-form transcription workers with {num_threads} threads each")
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_chunk_worker,
+        initargs=(num_threads,)
+    )
+    # A recycled pipeline worker joins its child processes on exit, so the
+    # chunk workers must be told to stop first. The priority runs this before
+    # the call queue's own exit hook (priority 10) closes its feeder thread.
+    multiprocessing.util.Finalize(
+        executor,
+        executor.shutdown,
+        kwargs={"wait": True, "cancel_futures": True},
+        exitpriority=100
+    )
+    return executor
+
+
+def warm_up_longform_executor() -> None:
+    """Start every chunk worker and wait until each has loaded the model."""
+    executor = get_longform_executor()
+    # Submitted together, so none is idle yet and each spawns its own worker
+    futures = [executor.submit(_chunk_worker_ready) for _ in range(get_settings().longform_workers)]
+    for future in futures:
+        future.result()
+
+
+def plan_chunks(
+    audio: AudioBuffer,
+    max_chunk_seconds: float = 30.0,
+    min_pause_duration: float = 0.2
+) -> list[tuple[float, float]]:
+    """
+    Choose chunk boundaries at natural pauses.
+
+    Each chunk ends at the middle of the last pause that keeps it within
+    `max_chunk_seconds`. Chunks are never cut shorter than half that length
+    to reach a pause; if there is no pause in the second half of the
+    window, the chunk is cut at the limit.
+
+    Args:
+        audio: Decoded audio buffer.
+        max_chunk_seconds: Maximum chunk length in seconds.
+        min_pause_duration: Shortest pause considered as a cut point.
+
+    Returns:
+        List of (start, end) times in seconds covering the whole recording.
+    """
+    pauses = detect_pauses_librosa(audio, min_pause_duration=min_pause_duration)
+    cuts = (pauses.starts + pauses.ends) / 2
+
+    bounds = [0.0]
+    while audio.duration - bounds[-1] > max_chunk_seconds:
+        start = bounds[-1]
+        limit = start + max_chunk_seconds
+        i = np.searchsorted(cuts, limit, side="right") - 1
+        if i >= 0 and cuts[i] > start + max_chunk_seconds / 2:
+            bounds.append(float(cuts[i]))
+        else:
+            bounds.append(limit)
+    bounds.append(audio.duration)
+
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def stitch_transcripts(
+    results: list[dict],
+    chunks: list[tuple[float, float]]
+) -> TranscriptionResult:
+    """
+    Merge per-chunk Whisper results onto the recording's timeline.
+
+    Segment and word timestamps are shifted by their chunk's start time
+    (and clamped to its end), and segment IDs are renumbered.
+
+    Args:
+        results: Raw Whisper results, one per chunk.
+        chunks: (start, end) times of each chunk in seconds.
+
+    Returns:
+        TranscriptionResult for the whole recording.
+    """
+    segments = []
+    languages: Counter[str] = Counter()
+
+    for result, (offset, end) in zip(results, chunks):
+        languages[result["language"]] += end - offset
+        for segment in result["segments"]:
+            segment = dict(segment)
+            segment["id"] = len(segments)
+            segment["start"] = min(segment["start"] + offset, end)
+            segment["end"] = min(segment["end"] + offset, end)
+            if "words" in segment:
+                segment["words"] = [
+                    {**word, "start": min(word["start"] + offset, end), "end": min(word["end"] + offset, end)}
+                    for word in segment["words"]
+                ]
+            segments.append(segment)
+
+    return TranscriptionResult(
+        text=" ".join(result["text"].strip() for result in results if result["text"].strip()),
+        segments=segments,
+        language=languages.most_common(1)[0][0] if languages else "",
+        duration=segments[-1]["end"] if segments else 0.0
+    )
+
+
+def transcribe_long_form(audio: AudioBuffer) -> TranscriptionResult:
+    """
+    Transcribe a long recording as pause-aligned chunks in parallel.
+
+    Args:
+        audio: Decoded audio buffer.
+
+    Returns:
+        TranscriptionResult with the same shape as `transcribe_audio`.
+    """
+    settings = get_settings()
+    chunks = plan_chunks(audio, max_chunk_seconds=settings.longform_chunk_seconds)
+    logger.info(f"Transcribing {audio.duration:.2f}s as {len(chunks)} chunks")
+
+    samples = audio.for_whisper()
+    pieces = [
+        samples[int(start * WHISPER_SAMPLE_RATE):int(end * WHISPER_SAMPLE_RATE)]
+        for start, end in chunks
+    ]
+
+    try:
+        results = list(get_longform_executor().map(_transcribe_chunk, pieces))
+    except Exception as e:
+        logger.error(f"Transcription failed: {e}")
+        raise
+
+    transcription = stitch_transcripts(results, chunks)
+    logger.info(f"Transcription complete: {len(transcription.text)} characters")
+    return transcription
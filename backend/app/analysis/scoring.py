@@ -10,6 +10,9 @@ from app.models import AudioMetrics, FluencyMetrics, PauseMetrics, ConfidenceSco
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever weights, ranges or formulas change; cached results are keyed on it
+SCORING_VERSION = "1"
+
 
 class ScoringWeights(NamedTuple):
     """Weights for different score components."""
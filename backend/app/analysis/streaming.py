@@ -0,0 +1,313 @@
+"""
+Streaming Analysis
+Updates speaking metrics incrementally while PCM audio is still arriving.
+"""
+
+import logging
+import threading
+from collections import deque
+from uuid import UUID
+
+import numpy as np
+
+from app.models import AnalysisResult, StreamingMetrics
+from app.analysis.acoustics import PITCH_FLOOR
+from app.analysis.audio import AudioBuffer
+from app.analysis.fluency import count_words, detect_fillers
+from app.analysis.longform import stitch_transcripts
+from app.analysis.online import PauseTracker, RunningStats, frame_rms, voiced_pitch
+from app.analysis.pauses import PauseSegments
+from app.analysis.pipeline import AnalysisPipeline
+from app.analysis.probe import AudioPolicyError
+from app.analysis.transcription import get_transcriber_pool
+
+logger = logging.getLogger(__name__)
+
+# Same framing and threshold as detect_pauses_librosa
+FRAME_SECONDS = 0.025
+HOP_SECONDS = 0.010
+SILENCE_THRESHOLD_DB = -40.0
+MIN_PAUSE_SECONDS = 0.3
+
+# New audio accumulated before pitch is extracted for it
+PITCH_BLOCK_SECONDS = 1.0
+# Context prepended to each pitch block (three periods at the pitch floor)
+PITCH_CONTEXT_SECONDS = 3 / PITCH_FLOOR
+
+# Speaking rate is computed over the transcribed windows covering this span
+ROLLING_WPM_SECONDS = 60.0
+# Longest window sent to Whisper (one encoder window)
+MAX_WINDOW_SECONDS = 30.0
+
+
+class StreamingAnalyzer:
+    """
+    Incremental analysis of a live 16-bit PCM stream.
+
+    `feed` appends audio and folds it into the online pitch and pause
+    accumulators from `app.analysis.online`. `next_window` hands out the
+    next completed window (cut at a pause) so most transcription can be
+    done before the stream ends; its result comes back through
+    `add_window`. The analyzer holds no model itself: transcription and
+    the final `analyze_stream` run wherever the pipeline executor runs
+    jobs, under the same admission limit.
+
+    `feed` and `interim` may be called from one thread while a window is
+    being transcribed elsewhere.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        max_duration: float,
+        window_seconds: float = 10.0,
+        session_id: UUID | None = None
+    ):
+        self.sample_rate = sample_rate
+        self.max_duration = max_duration
+        self.window_seconds = min(window_seconds, MAX_WINDOW_SECONDS)
+        self.session_id = session_id
+
+        self._lock = threading.Lock()
+        self._samples = np.empty(sample_rate * 10, dtype=np.float32)
+        self._length = 0
+
+        self._frame_length = int(FRAME_SECONDS * sample_rate)
+        self._hop_length = int(HOP_SECONDS * sample_rate)
+        self._rms_frames = 0
+        self._pause_tracker = PauseTracker(self._hop_length / sample_rate, SILENCE_THRESHOLD_DB, MIN_PAUSE_SECONDS)
+        # Midpoints of completed pauses that may still end a window, oldest first
+        self._cuts: deque[float] = deque()
+        self._pauses_seen = 0
+        self._leading_seen = False
+
+        self._pitched_until = 0
+        self._pitch_stats = RunningStats()
+
+        self._windows: list[tuple[float, float]] = []
+        self._window_results: list[dict] = []
+        self._transcribed_until = 0.0
+
+    @property
+    def duration(self) -> float:
+        """Seconds of audio received so far."""
+        return self._length / self.sample_rate
+
+    def feed(self, pcm: bytes) -> None:
+        """
+        Append little-endian 16-bit mono PCM.
+
+        Raises:
+            AudioPolicyError: 413 once the stream exceeds the maximum duration.
+        """
+        chunk = np.frombuffer(pcm[:len(pcm) - len(pcm) % 2], dtype="<i2").astype(np.float32) / 32768.0
+
+        with self._lock:
+            if self._length + len(chunk) > self._samples.shape[0]:
+                grown = np.empty(max(self._samples.shape[0] * 2, self._length + len(chunk)), dtype=np.float32)
+                grown[:self._length] = self._samples[:self._length]
+                self._samples = grown
+            self._samples[self._length:self._length + len(chunk)] = chunk
+            self._length += len(chunk)
+
+            if self.duration > self.max_duration:
+                raise AudioPolicyError(
+                    f"Audio duration exceeds maximum allowed ({self.max_duration}s)",
+                    status_code=413
+                )
+
+            self._update_rms()
+            if self._length - self._pitched_until >= PITCH_BLOCK_SECONDS * self.sample_rate:
+                self._update_pitch()
+
+    def _update_rms(self) -> None:
+        """Compute RMS for every frame whose window is now complete."""
+        available = (self._length - self._frame_length) // self._hop_length + 1
+        if available <= self._rms_frames:
+            return
+
+        start = self._rms_frames * self._hop_length
+        end = (available - 1) * self._hop_length + self._frame_length
+        tracker = self._pause_tracker
+        tracker.update(frame_rms(self._samples[start:end], self._frame_length, self._hop_length))
+        self._rms_frames = available
+
+        # Only pauses completed by this block become new cut candidates
+        if not self._leading_seen and tracker.leading and not tracker.all_silent:
+            self._leading_seen = True
+            if tracker.leading * tracker.hop_seconds >= tracker.min_pause_duration:
+                self._cuts.appendleft(tracker.leading / 2 * tracker.hop_seconds)
+        for run in tracker.closed[self._pauses_seen:]:
+            self._cuts.append((run.start + run.end) / 2 * tracker.hop_seconds)
+        self._pauses_seen = len(tracker.closed)
+
+    def _update_pitch(self) -> None:
+        """Extract pitch for samples since the last block and fold voiced frames into the running stats."""
+        context = int(PITCH_CONTEXT_SECONDS * self.sample_rate)
+        start = max(self._pitched_until - context, 0)
+        times, values = voiced_pitch(self._samples[start:self._length], self.sample_rate)
+        self._pitch_stats.update(values[times >= (self._pitched_until - start) / self.sample_rate])
+        self._pitched_until = self._length
+
+    def _pauses(self) -> PauseSegments:
+        """Pauses over the frames seen so far, relative to the loudest frame so far."""
+        return self._pause_tracker.pauses()
+
+    def interim(self) -> StreamingMetrics:
+        """Current running metrics."""
+        with self._lock:
+            duration = self.duration
+            pauses = self._pauses()
+            pitch_mean, pitch_std = self._pitch_stats.mean, self._pitch_stats.std
+            text = " ".join(result["text"].strip() for result in self._window_results)
+            windows = list(zip(self._windows, self._window_results))
+
+        total_pause = float(pauses.durations.sum()) if len(pauses) else 0.0
+
+        # Rolling speaking rate over the most recent windows
+        recent_words, recent_span = 0, 0.0
+        for (start, end), result in reversed(windows):
+            if recent_span >= ROLLING_WPM_SECONDS:
+                break
+            recent_words += count_words(result["text"])
+            recent_span += end - start
+
+        return StreamingMetrics(
+            duration=round(duration, 3),
+            pitch_mean=round(pitch_mean, 2),
+            pitch_std=round(pitch_std, 2),
+            pause_count=len(pauses),
+            total_pause_duration=round(total_pause, 3),
+            pause_ratio=round(total_pause / duration, 4) if duration > 0 else 0.0,
+            transcribed_duration=round(self._transcribed_until, 3),
+            word_count=count_words(text),
+            words_per_minute=round(recent_words / recent_span * 60, 1) if recent_span > 0 else 0.0,
+            filler_count=detect_fillers(text).count
+        )
+
+    def _next_cut(self) -> float | None:
+        """
+        End of the next window to transcribe, at a pause if one is available.
+
+        Looks only at pauses since the last window, so the cost per call
+        does not grow with the length of the stream.
+        """
+        start, now = self._transcribed_until, self.duration
+        if now - start < self.window_seconds:
+            return None
+
+        # Cuts this early can never end a window again: windows only move forward
+        earliest, latest = start + self.window_seconds / 2, min(now, start + MAX_WINDOW_SECONDS)
+        while self._cuts and self._cuts[0] <= earliest:
+            self._cuts.popleft()
+
+        cut = None
+        for candidate in self._cuts:
+            if candidate > latest:
+                break
+            cut = candidate
+
+        # A pause still running at the end of the audio received so far
+        tracker = self._pause_tracker
+        if tracker.trailing_start is not None:
+            end_frame = tracker.start_frame + tracker.frames - 1
+            if (end_frame - tracker.trailing_start) * tracker.hop_seconds >= tracker.min_pause_duration:
+                candidate = (tracker.trailing_start + end_frame) / 2 * tracker.hop_seconds
+                if earliest < candidate <= latest:
+                    cut = candidate
+
+        if cut is not None:
+            return float(cut)
+        if now - start >= MAX_WINDOW_SECONDS:
+            return start + MAX_WINDOW_SECONDS
+        return None
+
+    def window_ready(self) -> bool:
+        """Whether a complete window is waiting to be transcribed."""
+        with self._lock:
+            return self._next_cut() is not None
+
+    def next_window(self) -> tuple[float, float, np.ndarray] | None:
+        """
+        The next completed window to transcribe, if there is one.
+
+        Returns:
+            (start, end, samples), with the samples copied out of the buffer.
+        """
+        with self._lock:
+            start, end = self._transcribed_until, self._next_cut()
+            if end is None:
+                return None
+            return start, end, self._samples[int(start * self.sample_rate):int(end * self.sample_rate)].copy()
+
+    def add_window(self, start: float, end: float, result: dict) -> None:
+        """Record the transcription of a window returned by `next_window`."""
+        with self._lock:
+            self._windows.append((start, end))
+            self._window_results.append(result)
+            self._transcribed_until = end
+
+    def final_inputs(self) -> tuple[np.ndarray, list[tuple[float, float]], list[dict]]:
+        """
+        Everything `analyze_stream` needs once the stream has ended.
+
+        Must not be called while a window is being transcribed.
+
+        Returns:
+            (samples, transcribed windows, their transcriptions)
+
+        Raises:
+            AudioPolicyError: If no audio was received.
+        """
+        if self._length == 0:
+            raise AudioPolicyError("Audio stream contained no samples")
+        with self._lock:
+            return self._samples[:self._length].copy(), list(self._windows), list(self._window_results)
+
+
+def transcribe_samples(samples: np.ndarray, sample_rate: int) -> dict:
+    """Transcribe one window of a stream with a replica from this process's pool."""
+    audio = AudioBuffer(samples, sample_rate)
+    with get_transcriber_pool().checkout() as backend:
+        return backend.transcribe(audio.for_whisper())
+
+
+def analyze_stream(
+    samples: np.ndarray,
+    sample_rate: int,
+    windows: list[tuple[float, float]],
+    window_results: list[dict],
+    session_id: UUID | None = None
+) -> tuple[AnalysisResult, dict[str, float]]:
+    """
+    Transcribe the rest of a finished stream and run the full analysis.
+
+    Runs where the pipeline runs (see `PipelineExecutor.analyze_stream`).
+
+    Args:
+        samples: The whole recording at `sample_rate`.
+        windows: (start, end) of the windows transcribed while streaming.
+        window_results: Their Whisper results.
+        session_id: Session ID for the result.
+
+    Returns:
+        The analysis result and the duration of each stage.
+    """
+    windows, window_results = list(windows), list(window_results)
+    duration = len(samples) / sample_rate
+    transcribed_until = windows[-1][1] if windows else 0.0
+
+    # Whisper windows are at most 30 s; the tail may be longer if transcription fell behind
+    while duration - transcribed_until > 0.1:
+        end = min(transcribed_until + MAX_WINDOW_SECONDS, duration)
+        window = samples[int(transcribed_until * sample_rate):int(end * sample_rate)]
+        window_results.append(transcribe_samples(window, sample_rate))
+        windows.append((transcribed_until, end))
+        transcribed_until = end
+
+    pipeline = AnalysisPipeline(session_id)
+    result = pipeline.analyze_buffer(
+        AudioBuffer(samples, sample_rate),
+        transcription=stitch_transcripts(window_results, windows)
+    )
+    return result, pipeline.stage_seconds()
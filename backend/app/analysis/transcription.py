@@ -3,41 +3,318 @@ Speech-to-Text Transcription using OpenAI Whisper
 Handles audio transcription with timing information.
 """
 
+import inspect
 import logging
-from pathlib import Path
-from typing import Optional
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Iterator
 
-import whisper
 import numpy as np
 
 from app.config import get_settings
+from app.analysis.audio import AudioBuffer
+
+# torch and whisper take seconds to import; they are imported when a model is loaded
+if TYPE_CHECKING:
+    import whisper
+    from app.analysis.batching import BatchedEncoder
 
 logger = logging.getLogger(__name__)
 
 
-class WhisperTranscriber:
-    """Singleton wrapper for Whisper model."""
+class TranscriberBackend(ABC):
+    """
+    Interface for speech-to-text backends.
+    
+    A backend loads its model once and turns a 16 kHz mono float32 waveform
+    into a Whisper-style result dict with "text", "language" and "segments"
+    (each carrying per-word timestamps under "words").
+    """
+    
+    name: str = ""
+    
+    def __init__(self, model_size: str):
+        self.model_size = model_size
+        self.model = None
+    
+    @abstractmethod
+    def load(self) -> None:
+        """Load the model into memory."""
+    
+    def is_loaded(self) -> bool:
+        """Check if the model is loaded."""
+        return self.model is not None
+    
+    @abstractmethod
+    def transcribe(self, samples: np.ndarray) -> dict:
+        """Transcribe a 16 kHz waveform with word-level timestamps."""
+
+
+_BACKENDS: dict[str, type[TranscriberBackend]] = {}
+
+
+def register_backend(name: str):
+    """
+    Decorator registering a TranscriberBackend under `name`.
+    
+    Raises:
+        TypeError: If the class leaves `load` or `transcribe` unimplemented.
+    """
+    def decorator(cls: type[TranscriberBackend]) -> type[TranscriberBackend]:
+        if inspect.isabstract(cls):
+            missing = ", ".join(sorted(cls.__abstractmethods__))
+            raise TypeError(f"Transcriber backend '{name}' does not implement: {missing}")
+        cls.name = name
+        _BACKENDS[name] = cls
+        return cls
+    return decorator
+
+
+def available_backends() -> list[str]:
+    """Names of all registered transcriber backends."""
+    return sorted(_BACKENDS)
+
+
+def create_backend(name: str, model_size: str) -> TranscriberBackend:
+    """
+    Instantiate a registered backend (without loading it).
+    
+    Raises:
+        ValueError: If no backend is registered under `name`.
+    """
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown transcriber backend '{name}'. Available: {', '.join(available_backends())}")
+    return _BACKENDS[name](model_size)
+
+
+@register_backend("whisper")
+class WhisperBackend(TranscriberBackend):
+    """openai-whisper with full-precision weights."""
     
-    _model: Optional[whisper.Whisper] = None
-    _model_size: Optional[str] = None
+    def load(self) -> None:
+        import whisper
+        self.model = whisper.load_model(self.model_size)
     
-    @classmethod
-    def get_model(cls) -> whisper.Whisper:
-        """Get or load Whisper model."""
-        settings = get_settings()
+    def transcribe(self, samples: np.ndarray) -> dict:
+        return self.model.transcribe(samples, word_timestamps=True, verbose=False)
+
+
+def quantize_whisper(model: "whisper.Whisper") -> "whisper.Whisper":
+    """
+    Dynamically quantize a Whisper model's linear layers to int8.
+    
+    Weights are stored as int8 and activations are quantized per batch at
+    run time, which speeds up the attention and MLP projections on CPU.
+    Convolutions, layer norms and the token embedding stay in fp32.
+    """
+    import torch
+    
+    model = model.cpu()
+    
+    # Whisper subclasses nn.Linear only to cast weights to the input dtype;
+    # quantize_dynamic matches exact types, so expose them as plain Linear
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear):
+            module.__class__ = torch.nn.Linear
+    
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+@register_backend("whisper-int8")
+class QuantizedWhisperBackend(WhisperBackend):
+    """openai-whisper with int8 dynamically quantized linear layers (CPU only)."""
+    
+    def load(self) -> None:
+        super().load()
+        self.model = quantize_whisper(self.model)
+    
+    def transcribe(self, samples: np.ndarray) -> dict:
+        return self.model.transcribe(samples, word_timestamps=True, verbose=False, fp16=False)
+
+
+class TranscriberPool:
+    """
+    Fixed set of loaded transcriber replicas shared by concurrent requests.
+    
+    Each replica serves one request at a time: `checkout()` blocks until a
+    replica is idle and hands it back when the block exits. Replicas run
+    torch with `threads_per_replica` intra-op threads, so replica count and
+    thread count can be traded off against the available cores.
+    
+    With `encoder_batch_size > 1` and more than one replica, Whisper
+    replicas share one BatchedEncoder so encoder passes from concurrent
+    requests run as a single batch.
+    """
+    
+    def __init__(
+        self,
+        backend_name: str,
+        model_size: str,
+        replicas: int = 1,
+        threads_per_replica: int = 0,
+        encoder_batch_size: int = 1,
+        encoder_batch_wait_ms: float = 10.0
+    ):
+        self.backend_name = backend_name
+        self.model_size = model_size
+        self.replicas = max(replicas, 1)
+        self.threads_per_replica = threads_per_replica
+        self.encoder_batch_size = encoder_batch_size
+        self.encoder_batch_wait_ms = encoder_batch_wait_ms
         
-        if cls._model is None or cls._model_size != settings.whisper_model_size:
-            logger.info(f"Loading Whisper model: {settings.whisper_model_size}")
-            cls._model = whisper.load_model(settings.whisper_model_size)
-            cls._model_size = settings.whisper_model_size
-            logger.info("Whisper model loaded successfully")
+        self._batcher: "BatchedEncoder | None" = None
+        self._idle: queue.Queue[TranscriberBackend] = queue.Queue()
+        self._load_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._loaded_at: float | None = None
+        self.load_seconds: float | None = None
         
-        return cls._model
+        self._in_use = 0
+        self._checkouts = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._busy_seconds = 0.0
+    
+    def load(self) -> None:
+        """Load every replica (no-op once loaded)."""
+        with self._load_lock:
+            if self._loaded_at is not None:
+                return
+            
+            logger.info(
+                f"Loading {self.replicas} transcriber replica(s): {self.backend_name} ({self.model_size})"
+            )
+            started = time.perf_counter()
+            backends = []
+            for _ in range(self.replicas):
+                backend = create_backend(self.backend_name, self.model_size)
+                backend.load()
+                backends.append(backend)
+            
+            if self.encoder_batch_size > 1 and self.replicas > 1:
+                self._share_encoder(backends)
+            elif self.encoder_batch_size > 1:
+                # With one replica there are never concurrent encoder calls to batch
+                logger.warning(
+                    f"Ignoring encoder_batch_size={self.encoder_batch_size}: "
+                    f"encoder batching needs more than one replica in the process"
+                )
+            
+            for backend in backends:
+                self._idle.put(backend)
+            
+            self._loaded_at = time.monotonic()
+            self.load_seconds = time.perf_counter() - started
+            logger.info(f"Transcriber replicas loaded in {self.load_seconds:.2f}s")
+    
+    def _share_encoder(self, backends: list[TranscriberBackend]) -> None:
+        """Replace each Whisper replica's encoder with one shared BatchedEncoder."""
+        from app.analysis.batching import BatchedEncoder
+        
+        models = [backend.model for backend in backends if isinstance(backend, WhisperBackend)]
+        if not models:
+            logger.warning(f"Encoder batching is not supported by the {self.backend_name} backend")
+            return
+        
+        # The batching thread does the encoder work for every replica
+        num_threads = self.threads_per_replica * self.replicas if self.threads_per_replica > 0 else 0
+        self._batcher = BatchedEncoder(
+            models[0].encoder,
+            max_batch_size=self.encoder_batch_size,
+            max_wait_ms=self.encoder_batch_wait_ms,
+            num_threads=num_threads
+        )
+        for model in models:
+            model.encoder = self._batcher
+        logger.info(f"Batching encoder calls (up to {self.encoder_batch_size} windows, {self.encoder_batch_wait_ms} ms)")
     
-    @classmethod
-    def is_loaded(cls) -> bool:
-        """Check if model is loaded."""
-        return cls._model is not None
+    def is_loaded(self) -> bool:
+        """Check if the replicas are loaded."""
+        return self._loaded_at is not None
+    
+    @contextmanager
+    def checkout(self) -> Iterator[TranscriberBackend]:
+        """Borrow an idle replica, waiting for one if all are busy."""
+        self.load()
+        
+        requested = time.perf_counter()
+        backend = self._idle.get()
+        acquired = time.perf_counter()
+        
+        with self._stats_lock:
+            wait = acquired - requested
+            self._in_use += 1
+            self._checkouts += 1
+            self._wait_seconds += wait
+            self._max_wait_seconds = max(self._max_wait_seconds, wait)
+        
+        # Intra-op threads are configured on the thread that runs the replica
+        if self.threads_per_replica > 0:
+            import torch
+            torch.set_num_threads(self.threads_per_replica)
+        
+        try:
+            yield backend
+        finally:
+            with self._stats_lock:
+                self._in_use -= 1
+                self._busy_seconds += time.perf_counter() - acquired
+            self._idle.put(backend)
+    
+    def stats(self) -> dict[str, Any]:
+        """Checkout wait times and replica utilization since loading."""
+        with self._stats_lock:
+            uptime = time.monotonic() - self._loaded_at if self._loaded_at is not None else 0.0
+            return {
+                "backend": self.backend_name,
+                "replicas": self.replicas,
+                "threads_per_replica": self.threads_per_replica,
+                "loaded": self.is_loaded(),
+                "in_use": self._in_use,
+                "checkouts": self._checkouts,
+                "avg_wait_ms": round(self._wait_seconds / self._checkouts * 1000, 2) if self._checkouts else 0.0,
+                "max_wait_ms": round(self._max_wait_seconds * 1000, 2),
+                "utilization": round(self._busy_seconds / (uptime * self.replicas), 4) if uptime else 0.0,
+                "encoder_batching": self._batcher.stats() if self._batcher is not None else None,
+            }
+
+
+# Set in worker processes that run one job at a time
+_single_replica = False
+
+
+def use_single_replica() -> None:
+    """
+    Load a single replica in this process.
+
+    Called by the initializers of pipeline, long-form chunk and batch
+    workers: each runs one job at a time, so further replicas would only
+    cost memory. Must be called before the pool is first used.
+    """
+    global _single_replica
+    _single_replica = True
+
+
+@lru_cache
+def get_transcriber_pool() -> TranscriberPool:
+    """Get the shared transcriber pool configured from settings."""
+    settings = get_settings()
+    replicas = settings.transcriber_replicas
+    if _single_replica and replicas > 1:
+        logger.warning(f"Ignoring transcriber_replicas={replicas}: this worker process runs one job at a time")
+        replicas = 1
+    return TranscriberPool(
+        settings.transcriber_backend,
+        settings.whisper_model_size,
+        replicas=replicas,
+        threads_per_replica=settings.transcriber_threads,
+        encoder_batch_size=settings.encoder_batch_size,
+        encoder_batch_wait_ms=settings.encoder_batch_wait_ms
+    )
 
 
 class TranscriptionResult:
@@ -65,12 +342,12 @@ class TranscriptionResult:
         return words
 
 
-def transcribe_audio(audio_path: Path) -> TranscriptionResult:
+def transcribe_audio(audio: AudioBuffer) -> TranscriptionResult:
     """
-    Transcribe audio file using Whisper.
+    Transcribe decoded audio using Whisper.
     
     Args:
-        audio_path: Path to the audio file.
+        audio: Decoded audio buffer.
         
     Returns:
         TranscriptionResult containing text and timing information.
@@ -78,17 +355,12 @@ def transcribe_audio(audio_path: Path) -> TranscriptionResult:
     Raises:
         Exception: If transcription fails.
     """
-    model = WhisperTranscriber.get_model()
-    
-    logger.info(f"Transcribing audio: {audio_path}")
+    logger.info(f"Transcribing audio: {audio.duration:.2f}s")
     
     try:
-        # Transcribe with word-level timestamps
-        result = model.transcribe(
-            str(audio_path),
-            word_timestamps=True,
-            verbose=False
-        )
+        # Transcribe with word-level timestamps (16 kHz waveform skips Whisper's ffmpeg decode)
+        with get_transcriber_pool().checkout() as backend:
+            result = backend.transcribe(audio.for_whisper())
         
         transcription = TranscriptionResult(
             text=result["text"].strip(),
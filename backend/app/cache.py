@@ -0,0 +1,203 @@
+"""
+Analysis Result Cache
+Content-addressed cache of analysis results with memory and disk tiers.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+from app.config import Settings, get_settings
+from app.models import AnalysisResult
+from app.analysis.scoring import SCORING_VERSION
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_audio_file(audio_path: Path) -> str:
+    """SHA-256 of a file's bytes, read in chunks."""
+    digest = hashlib.sha256()
+    with open(audio_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def config_fingerprint(settings: Settings | None = None) -> dict[str, Any]:
+    """
+    The settings that change the result for identical audio.
+
+    Covers the Whisper model size and backend, the filler lexicon, the
+    scoring version and, when long-form mode is on, how recordings are
+    split into chunks.
+
+    Args:
+        settings: Settings to describe (defaults to the current settings).
+    """
+    settings = settings or get_settings()
+    longform = None
+    if settings.longform_workers > 0:
+        longform = {
+            "min_duration_seconds": settings.longform_min_duration_seconds,
+            "chunk_seconds": settings.longform_chunk_seconds,
+        }
+    return {
+        "whisper_model_size": settings.whisper_model_size,
+        "transcriber_backend": settings.transcriber_backend,
+        "filler_words": settings.filler_words,
+        "scoring_version": SCORING_VERSION,
+        "longform": longform,
+    }
+
+
+def cache_key(audio_sha256: str, settings: Settings | None = None) -> str:
+    """
+    Build the cache key for an upload.
+
+    The key covers the audio and everything in `config_fingerprint`.
+
+    Args:
+        audio_sha256: Hex SHA-256 of the uploaded bytes.
+        settings: Settings to key on (defaults to the current settings).
+
+    Returns:
+        Hex SHA-256 cache key.
+    """
+    material = json.dumps({"audio": audio_sha256, **config_fingerprint(settings)}, sort_keys=True)
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier LRU cache of serialized AnalysisResults.
+
+    The memory tier is an OrderedDict bounded by total payload bytes. The
+    disk tier stores one JSON file per key, bounded by total file size and
+    evicted oldest-first by modification time (hits refresh the mtime).
+    Disk hits are promoted to memory.
+    """
+
+    def __init__(self, cache_dir: Path, memory_max_bytes: int, disk_max_bytes: int):
+        self.cache_dir = cache_dir
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._disk_bytes = sum(path.stat().st_size for path in self.cache_dir.glob("*.json"))
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _remember(self, key: str, payload: bytes) -> None:
+        """Insert into the memory tier, evicting least recently used entries."""
+        if len(payload) > self.memory_max_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = payload
+        self._memory_bytes += len(payload)
+        while self._memory_bytes > self.memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _evict_disk(self) -> None:
+        """Delete the oldest files until the disk tier fits its budget."""
+        if self._disk_bytes <= self.disk_max_bytes:
+            return
+        entries = sorted(
+            (path.stat().st_mtime, path.stat().st_size, path) for path in self.cache_dir.glob("*.json")
+        )
+        self._disk_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._disk_bytes <= self.disk_max_bytes:
+                break
+            try:
+                path.unlink()
+                self._disk_bytes -= size
+            except FileNotFoundError:
+                pass
+
+    def get(self, key: str) -> AnalysisResult | None:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Cache key from `cache_key`.
+
+        Returns:
+            The cached result under a fresh session ID and timestamp, or None.
+        """
+        with self._lock:
+            payload = self._memory.get(key)
+            if payload is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+            else:
+                path = self._path(key)
+                try:
+                    payload = path.read_bytes()
+                    os.utime(path)
+                    self.disk_hits += 1
+                    self._remember(key, payload)
+                except FileNotFoundError:
+                    self.misses += 1
+                    return None
+
+        result = AnalysisResult.model_validate_json(payload)
+        return result.model_copy(update={"session_id": uuid4(), "analyzed_at": datetime.utcnow()})
+
+    def put(self, key: str, result: AnalysisResult) -> None:
+        """Store a result in both tiers."""
+        payload = result.model_dump_json().encode()
+        with self._lock:
+            self._remember(key, payload)
+
+            path = self._path(key)
+            previous = path.stat().st_size if path.exists() else 0
+            temp_path = path.with_suffix(".tmp")
+            temp_path.write_bytes(payload)
+            os.replace(temp_path, path)
+            self._disk_bytes += len(payload) - previous
+            self._evict_disk()
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters and tier sizes."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_bytes": self._disk_bytes,
+        }
+
+
+@lru_cache
+def get_result_cache() -> ResultCache:
+    """Get the shared result cache configured from settings."""
+    settings = get_settings()
+    return ResultCache(
+        Path(settings.cache_dir),
+        memory_max_bytes=settings.cache_memory_max_bytes,
+        disk_max_bytes=settings.cache_disk_max_bytes
+    )
@@ -13,12 +13,73 @@ class Settings(BaseSettings):
     # Supabase Configuration
     supabase_url: str
     supabase_key: str
+    db_timeout_seconds: float = 5.0  # Upper bound on every database request
+    db_pool_size: int = 10  # Pooled keep-alive HTTP connections to Supabase
+    db_health_interval_seconds: float = 15.0  # How often the background probe checks the connection
+    db_health_ttl_seconds: float = 60.0  # Probe results older than this count as disconnected
+    db_record_cache_size: int = 1024  # Analysis records kept in memory for GET /analysis; 0 disables
+    db_record_cache_ttl_seconds: float = 3600.0
     
     # Whisper Configuration
     whisper_model_size: str = "base"
+    transcriber_backend: str = "whisper"  # "whisper" (fp32) or "whisper-int8" (quantized, CPU)
+    transcriber_replicas: int = 1  # Model copies per process; each serves one request at a time
+    transcriber_threads: int = 0  # torch intra-op threads per replica; 0 keeps torch's default
+    encoder_batch_size: int = 1  # Max 30 s windows per shared encoder batch; 1 disables batching
+    encoder_batch_wait_ms: float = 10.0  # How long a batch waits to fill before running
+    longform_workers: int = 0  # Processes transcribing chunks of long recordings; 0 disables long-form mode
+    longform_min_duration_seconds: float = 90.0  # Recordings at least this long are split
+    longform_chunk_seconds: float = 30.0  # Maximum chunk length (one Whisper window)
+    
+    # Pipeline Execution Configuration
+    pipeline_workers: int = 2  # Worker processes; 0 runs the pipeline on a single background thread
+    pipeline_max_tasks_per_worker: int = 50  # Recycle a worker process after this many jobs
+    pipeline_queue_size: int = 4  # Jobs allowed to wait for a free worker before rejecting
+    pipeline_retry_after_seconds: int = 15  # Retry-After hint when the queue is full
+    pipeline_stage_threads: int = 3  # Independent stages run concurrently; 1 runs them in order
+    pipeline_warmup_seconds: float = 3.0  # Synthetic audio run through the pipeline before reporting ready; 0 skips
+    
+    # Job Queue Configuration
+    job_db_path: str = "data/jobs.sqlite3"  # SQLite file backing the job queue
+    job_spool_dir: str = "data/jobs"  # Uploaded audio waiting to be analyzed
+    job_queue_max: int = 100  # Queued jobs allowed before new submissions are rejected
+    job_retention_hours: int = 24  # Finished jobs are pruned after this long
+    job_lease_seconds: float = 60.0  # Running jobs of a process that stops renewing this long are requeued
+    
+    # Database Writer Configuration
+    db_write_batch_size: int = 50  # Results written per database request
+    db_write_flush_interval_seconds: float = 0.5  # How long a batch waits to fill before writing
+    db_write_max_retries: int = 3  # Retries (with exponential backoff) before a batch is spooled
+    db_write_retry_backoff_seconds: float = 0.5  # Delay before the first retry; doubles each time
+    db_spool_path: str = "data/db_spool.sqlite3"  # Results held while the database is unreachable
+    db_replay_interval_seconds: float = 30.0  # How often spooled results are retried
+    
+    # Batch Upload Configuration
+    batch_max_files: int = 100  # Recordings per /analyze-batch request (files or archive entries)
+    batch_max_upload_bytes: int = 1024 * 1024 * 1024  # Whole /analyze-batch request body
+    batch_concurrency: int = 4  # Recordings from one batch in the job queue at a time
+    
+    # Profiling Configuration
+    profile_sample_rate: float = 0.0  # Fraction of pipeline runs profiled with cProfile; 0 disables sampling
+    profile_top_entries: int = 30  # Functions kept per profile, by cumulative time
+    profile_dir: str = "data/profiles"  # One JSON file per profiled session
+    profile_max_stored: int = 200  # Oldest profiles are deleted beyond this many
+    admin_token: str = ""  # X-Admin-Token for ?profile=true and /debug endpoints; empty disables them
+    
+    # Result Cache Configuration
+    cache_enabled: bool = True
+    cache_dir: str = "data/cache"  # Disk tier, one JSON file per result
+    cache_memory_max_bytes: int = 32 * 1024 * 1024
+    cache_disk_max_bytes: int = 512 * 1024 * 1024
+    
+    # Streaming Analysis Configuration
+    stream_window_seconds: float = 10.0  # Audio collected before a window is transcribed mid-stream
+    stream_interim_interval_seconds: float = 1.0  # How often interim metrics are pushed
     
     # Audio Processing Configuration
     max_audio_duration_seconds: int = 600  # 10 minutes max
+    max_upload_bytes: int = 128 * 1024 * 1024  # 10 minutes of 44.1 kHz stereo 16-bit WAV fits
+    upload_chunk_size: int = 1024 * 1024  # Uploads are copied to disk in chunks of this size
     allowed_audio_types: list[str] = ["audio/wav", "audio/mpeg", "audio/mp3", "audio/x-wav"]
     
     # Filler words to detect
@@ -3,11 +3,19 @@ Supabase Database Client
 Handles all database interactions with Supabase.
 """
 
+import asyncio
+import base64
+import json
 import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
 from typing import Any, Optional
 from uuid import UUID
 
-from supabase import create_client, Client
+import httpx
+from supabase import AsyncClient, AsyncClientOptions, create_async_client
 
 from app.config import get_settings
 from app.models import AnalysisResult
@@ -16,50 +24,133 @@ logger = logging.getLogger(__name__)
 
 
 class SupabaseClient:
-    """Singleton Supabase client wrapper."""
+    """
+    Singleton async Supabase client wrapper.
+    
+    All requests share one pooled `httpx.AsyncClient`, so connections are
+    kept alive and reused instead of being opened per call.
+    """
     
-    _instance: Optional[Client] = None
+    _instance: Optional[AsyncClient] = None
+    _http: Optional[httpx.AsyncClient] = None
+    _lock: Optional[asyncio.Lock] = None
     
     @classmethod
-    def get_client(cls) -> Client:
+    async def get_client(cls) -> AsyncClient:
         """Get or create Supabase client instance."""
         if cls._instance is None:
-            settings = get_settings()
-            cls._instance = create_client(
-                settings.supabase_url,
-                settings.supabase_key
-            )
-            logger.info("Supabase client initialized successfully")
+            cls._lock = cls._lock or asyncio.Lock()
+            async with cls._lock:
+                if cls._instance is None:
+                    settings = get_settings()
+                    cls._http = httpx.AsyncClient(
+                        limits=httpx.Limits(
+                            max_connections=settings.db_pool_size,
+                            max_keepalive_connections=settings.db_pool_size
+                        ),
+                        timeout=settings.db_timeout_seconds,
+                        follow_redirects=True
+                    )
+                    cls._instance = await create_async_client(
+                        settings.supabase_url,
+                        settings.supabase_key,
+                        options=AsyncClientOptions(httpx_client=cls._http)
+                    )
+                    logger.info("Supabase client initialized successfully")
         return cls._instance
     
+    @classmethod
+    async def close(cls) -> None:
+        """Close pooled connections and drop the client."""
+        if cls._http is not None:
+            await cls._http.aclose()
+        cls.reset_client()
+    
     @classmethod
     def reset_client(cls) -> None:
         """Reset client instance (useful for testing)."""
         cls._instance = None
+        cls._http = None
+        cls._lock = None
 
 
-def get_supabase() -> Client:
+async def get_supabase() -> AsyncClient:
     """Dependency injection for Supabase client."""
-    return SupabaseClient.get_client()
+    return await SupabaseClient.get_client()
 
 
-async def insert_analysis_result(result: AnalysisResult) -> dict[str, Any]:
+async def _execute(query) -> Any:
+    """Run a query builder, bounded by the database timeout end to end."""
+    timeout = get_settings().db_timeout_seconds
+    try:
+        return await asyncio.wait_for(query.execute(), timeout)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Database request timed out after {timeout}s") from None
+
+
+class RecordCache:
     """
-    Insert analysis result into the 'features' table.
+    LRU cache of 'features' rows keyed by session ID, with a TTL.
+    
+    Rows never change once written, so entries are filled at write time
+    and on read misses and only leave by eviction or expiry.
+    """
+    
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, session_id: str) -> Optional[dict[str, Any]]:
+        entry = self._entries.get(session_id)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            if entry is not None:
+                del self._entries[session_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(session_id)
+        self.hits += 1
+        return entry[1]
+    
+    def put(self, record: dict[str, Any]) -> None:
+        if self.max_entries <= 0:
+            return
+        session_id = str(record["session_id"])
+        self._entries[session_id] = (time.monotonic(), record)
+        self._entries.move_to_end(session_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+
+@lru_cache
+def get_record_cache() -> RecordCache:
+    """Get the shared record cache configured from settings."""
+    settings = get_settings()
+    return RecordCache(settings.db_record_cache_size, settings.db_record_cache_ttl_seconds)
+
+
+def analysis_record(result: AnalysisResult) -> dict[str, Any]:
+    """
+    Flatten an analysis result into a row of the 'features' table.
     
     Args:
         result: The complete analysis result to store.
         
     Returns:
-        The inserted record from Supabase.
-        
-    Raises:
-        Exception: If database insertion fails.
+        JSON-serializable record.
     """
-    client = get_supabase()
-    
-    # Prepare the record for insertion
-    record = {
+    return {
         "session_id": str(result.session_id),
         "transcription": result.transcription,
         "audio_duration": result.audio_duration,
@@ -95,11 +186,56 @@ async def insert_analysis_result(result: AnalysisResult) -> dict[str, Any]:
         # Timestamp
         "analyzed_at": result.analyzed_at.isoformat()
     }
+
+
+async def insert_analysis_records(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Write a batch of records to the 'features' table in one request.
+    
+    Upserts on session_id, so retrying a batch that was partly or wholly
+    written before is harmless. The stored rows are added to the record
+    cache.
+    
+    Args:
+        records: Rows built by `analysis_record`.
+        
+    Returns:
+        The rows as stored.
+        
+    Raises:
+        Exception: If the write fails.
+    """
+    client = await get_supabase()
+    response = await _execute(client.table("features").upsert(records, on_conflict="session_id"))
+    
+    cache = get_record_cache()
+    for row in response.data:
+        cache.put(row)
+    return response.data
+
+
+async def insert_analysis_result(result: AnalysisResult) -> dict[str, Any]:
+    """
+    Insert analysis result into the 'features' table.
+    
+    Most callers should queue results on `app.db_writer.ResultWriter`
+    instead, which batches writes and survives outages.
+    
+    Args:
+        result: The complete analysis result to store.
+        
+    Returns:
+        The inserted record.
+        
+    Raises:
+        Exception: If database insertion fails.
+    """
+    record = analysis_record(result)
     
     try:
-        response = client.table("features").insert(record).execute()
+        rows = await insert_analysis_records([record])
         logger.info(f"Successfully inserted analysis result for session {result.session_id}")
-        return response.data[0] if response.data else record
+        return rows[0] if rows else record
     except Exception as e:
         logger.error(f"Failed to insert analysis result: {e}")
         raise
@@ -109,20 +245,29 @@ async def get_analysis_by_session(session_id: UUID) -> Optional[dict[str, Any]]:
     """
     Retrieve analysis result by session ID.
     
+    Served from the record cache when possible; rows read from the
+    database are cached. Missing sessions are not cached, since they may
+    still be waiting to be written.
+    
     Args:
         session_id: The UUID of the session to retrieve.
         
     Returns:
         The analysis record if found, None otherwise.
     """
-    client = get_supabase()
+    cache = get_record_cache()
+    cached = cache.get(str(session_id))
+    if cached is not None:
+        return cached
     
     try:
-        response = client.table("features").select("*").eq(
+        client = await get_supabase()
+        response = await _execute(client.table("features").select("*").eq(
             "session_id", str(session_id)
-        ).execute()
+        ))
         
         if response.data:
+            cache.put(response.data[0])
             return response.data[0]
         return None
     except Exception as e:
@@ -130,6 +275,114 @@ async def get_analysis_by_session(session_id: UUID) -> Optional[dict[str, Any]]:
         raise
 
 
+# Columns of the 'features' table that can be requested from GET /analyses
+FEATURE_COLUMNS = (
+    "id", "session_id", "transcription", "audio_duration",
+    "pitch_mean", "pitch_std", "jitter_local", "shimmer_local", "harmonics_to_noise_ratio",
+    "wpm", "filler_count", "filler_words_found", "total_words", "articulation_rate",
+    "total_pause_duration", "pause_count", "pause_ratio", "average_pause_duration", "longest_pause",
+    "confidence_score", "pitch_score", "fluency_score", "voice_quality_score", "pace_score",
+    "analyzed_at", "created_at",
+)
+
+# Listing defaults to every column except the (large) transcription
+DEFAULT_LIST_COLUMNS = tuple(column for column in FEATURE_COLUMNS if column != "transcription")
+
+# Always selected, since the pagination cursor is built from them
+_CURSOR_COLUMNS = ("analyzed_at", "session_id")
+
+
+def encode_cursor(record: dict[str, Any]) -> str:
+    """Opaque cursor pointing just past a record in listing order."""
+    payload = json.dumps([record["analyzed_at"], str(record["session_id"])])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    """
+    Decode a cursor from `encode_cursor`.
+    
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        analyzed_at, session_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        datetime.fromisoformat(analyzed_at)
+        return analyzed_at, str(UUID(session_id))
+    except Exception:
+        raise ValueError("Invalid cursor") from None
+
+
+async def list_analyses(
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    fields: Optional[list[str]] = None
+) -> tuple[list[dict[str, Any]], Optional[str]]:
+    """
+    List analysis records, newest first, one page at a time.
+    
+    Uses keyset pagination on (analyzed_at, session_id), which the
+    analyzed_at index serves without scanning skipped rows the way an
+    offset would.
+    
+    Args:
+        limit: Maximum records to return.
+        cursor: `next_cursor` from the previous page.
+        since: Only records analyzed at or after this time.
+        until: Only records analyzed before this time.
+        min_score: Minimum overall confidence score.
+        max_score: Maximum overall confidence score.
+        fields: Columns to return (defaults to all but the transcription);
+            analyzed_at and session_id are always included.
+        
+    Returns:
+        The page of records and the cursor for the next page (None on the last page).
+        
+    Raises:
+        ValueError: If the cursor or a field name is invalid.
+    """
+    columns = list(fields or DEFAULT_LIST_COLUMNS)
+    unknown = sorted(set(columns) - set(FEATURE_COLUMNS))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    columns += [column for column in _CURSOR_COLUMNS if column not in columns]
+    
+    client = await get_supabase()
+    query = client.table("features").select(",".join(columns))
+    
+    if since is not None:
+        query = query.gte("analyzed_at", since.isoformat())
+    if until is not None:
+        query = query.lt("analyzed_at", until.isoformat())
+    if min_score is not None:
+        query = query.gte("confidence_score", min_score)
+    if max_score is not None:
+        query = query.lte("confidence_score", max_score)
+    if cursor is not None:
+        analyzed_at, session_id = decode_cursor(cursor)
+        query = query.or_(
+            f'analyzed_at.lt."{analyzed_at}",'
+            f'and(analyzed_at.eq."{analyzed_at}",session_id.lt.{session_id})'
+        )
+    
+    # One extra row tells us whether another page follows
+    query = query.order("analyzed_at", desc=True).order("session_id", desc=True).limit(limit + 1)
+    
+    try:
+        response = await _execute(query)
+    except Exception as e:
+        logger.error(f"Failed to list analysis results: {e}")
+        raise
+    
+    records = response.data[:limit]
+    next_cursor = encode_cursor(records[-1]) if len(response.data) > limit else None
+    return records, next_cursor
+
+
 async def check_connection() -> bool:
     """
     Check if Supabase connection is working.
@@ -138,10 +391,78 @@ async def check_connection() -> bool:
         True if connection is successful, False otherwise.
     """
     try:
-        client = get_supabase()
+        client = await get_supabase()
         # Simple query to check connection
-        client.table("features").select("session_id").limit(1).execute()
+        await _execute(client.table("features").select("session_id").limit(1))
         return True
     except Exception as e:
         logger.warning(f"Supabase connection check failed: {e}")
         return False
+
+
+class HealthProbe:
+    """
+    Background database health check.
+    
+    Runs `check_connection` every `interval` seconds and caches the answer,
+    so health endpoints never query the database themselves. A result older
+    than `ttl` seconds (the probe has stalled) counts as disconnected.
+    """
+    
+    def __init__(self, interval: float = 15.0, ttl: float = 60.0):
+        self.interval = interval
+        self.ttl = ttl
+        self._connected = False
+        self._checked_at: Optional[float] = None
+        self._latency = 0.0
+        self._task: Optional[asyncio.Task] = None
+    
+    async def refresh(self) -> bool:
+        """Check the connection now and cache the result."""
+        started = time.monotonic()
+        self._connected = await check_connection()
+        self._checked_at = time.monotonic()
+        self._latency = self._checked_at - started
+        return self._connected
+    
+    def start(self) -> None:
+        """Start refreshing in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="db-health-probe")
+    
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+    
+    async def _run(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+    
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the last completed check."""
+        return None if self._checked_at is None else time.monotonic() - self._checked_at
+    
+    @property
+    def connected(self) -> bool:
+        """Cached connection state; False if never checked or stale."""
+        age = self.age
+        return self._connected and age is not None and age <= self.ttl
+    
+    def status(self) -> dict[str, Any]:
+        age = self.age
+        return {
+            "connected": self.connected,
+            "checked_seconds_ago": None if age is None else round(age, 1),
+            "latency_ms": round(self._latency * 1000, 1),
+        }
+
+
+@lru_cache
+def get_health_probe() -> HealthProbe:
+    """Get the shared database health probe configured from settings."""
+    settings = get_settings()
+    return HealthProbe(settings.db_health_interval_seconds, settings.db_health_ttl_seconds)
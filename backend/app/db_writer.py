@@ -0,0 +1,288 @@
+"""
+Background Database Writer
+Batches analysis results into multi-row writes off the request path, spooling to SQLite during outages.
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import random
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator
+
+from app.config import get_settings
+from app.database import analysis_record, insert_analysis_records
+from app.metrics import get_metrics
+from app.models import AnalysisResult
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    record TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+"""
+
+
+class WriteSpool:
+    """SQLite-backed FIFO of records that could not be written to the database."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection that commits on success and always closes."""
+        conn = sqlite3.connect(self.db_path, timeout=10.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def push(self, records: list[dict[str, Any]]) -> None:
+        """Append records to the spool."""
+        now = datetime.utcnow().isoformat()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO pending (session_id, record, created_at) VALUES (?, ?, ?)",
+                [(record["session_id"], json.dumps(record), now) for record in records]
+            )
+
+    def peek(self, limit: int) -> list[tuple[int, dict[str, Any]]]:
+        """Oldest spooled records with their row IDs."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT id, record FROM pending ORDER BY id LIMIT ?", (limit,)).fetchall()
+        return [(row_id, json.loads(record)) for row_id, record in rows]
+
+    def remove(self, ids: list[int]) -> None:
+        """Delete records that have been written."""
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM pending WHERE id = ?", [(row_id,) for row_id in ids])
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+
+
+class ResultWriter:
+    """
+    Writes analysis results to the database in the background.
+
+    `submit` only enqueues, so request latency no longer includes the
+    database round trip. A writer task collects up to `batch_size` records
+    (waiting at most `flush_interval` seconds after the first) and writes
+    them in one request, retrying with exponential backoff. Batches that
+    still fail are spooled to SQLite, and a replay task writes them back
+    once the database is reachable, backing off while it is not. Either
+    task is logged and restarted if it crashes.
+    """
+
+    MAX_REPLAY_INTERVAL_SECONDS = 600
+
+    def __init__(
+        self,
+        spool: WriteSpool,
+        batch_size: int = 50,
+        flush_interval: float = 0.5,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        replay_interval: float = 30.0,
+        queue_size: int = 1000
+    ):
+        self.spool = spool
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.replay_interval = replay_interval
+
+        # None is the shutdown sentinel
+        self._queue: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue(maxsize=queue_size)
+        self._tasks: list[asyncio.Task] = []
+        self._spooling: set[asyncio.Task] = set()
+        self._stopping = False
+
+        self._written = 0
+        self._batches = 0
+        self._retries = 0
+        self._spooled = 0
+        self._replayed = 0
+        self._flush_seconds = 0.0
+        self._max_flush_seconds = 0.0
+        self._last_flush_seconds = 0.0
+
+    def start(self) -> None:
+        """Start the writer and replay tasks on the running loop."""
+        if self._tasks:
+            return
+        self._stopping = False
+        self._tasks = [self._spawn(self._run, "db-writer"), self._spawn(self._replay, "db-replay")]
+
+    def _spawn(self, run, name: str) -> asyncio.Task:
+        task = asyncio.create_task(run(), name=name)
+        task.add_done_callback(functools.partial(self._on_task_done, run))
+        return task
+
+    def _on_task_done(self, run, task: asyncio.Task) -> None:
+        if task.cancelled() or task.exception() is None:
+            return
+        logger.error(f"Background task {task.get_name()} crashed", exc_info=task.exception())
+        if self._stopping or task not in self._tasks:
+            return
+        self._tasks[self._tasks.index(task)] = self._spawn(run, task.get_name())
+
+    async def stop(self) -> None:
+        """Write (or spool) everything still queued, then stop the background tasks."""
+        if not self._tasks:
+            return
+        self._stopping = True
+        writer, replay = self._tasks
+        await self._queue.put(None)
+        await asyncio.gather(writer, return_exceptions=True)
+        replay.cancel()
+        await asyncio.gather(replay, *self._spooling, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, result: AnalysisResult) -> None:
+        """
+        Queue a result for writing; never blocks on the database.
+
+        The record cache is filled with the row the database returns (with
+        its `id` and `created_at`) once the write succeeds, so reads always
+        see the stored shape.
+        """
+        record = analysis_record(result)
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            logger.warning(f"Database write queue full, spooling session {result.session_id}")
+            # The spool is a synchronous SQLite write; keep it off the event loop
+            task = asyncio.create_task(self._spool([record]))
+            self._spooling.add(task)
+            task.add_done_callback(self._spooling.discard)
+
+    async def _spool(self, records: list[dict[str, Any]]) -> None:
+        try:
+            await asyncio.to_thread(self.spool.push, records)
+        except Exception as e:
+            logger.error(f"Failed to spool {len(records)} analysis results, they are lost: {e}")
+            return
+        self._spooled += len(records)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            record = await self._queue.get()
+            if record is None:
+                return
+            batch = [record]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if record is None:
+                    stopping = True
+                    break
+                batch.append(record)
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[dict[str, Any]]) -> None:
+        """Write a batch, retrying with jittered exponential backoff, then spool it."""
+        retries = self.max_retries
+        for attempt in range(retries + 1):
+            start = time.perf_counter()
+            try:
+                await insert_analysis_records(batch)
+            except Exception as e:
+                if attempt == retries:
+                    logger.error(f"Database write failed after {attempt + 1} attempts, spooling {len(batch)} records: {e}")
+                    break
+                delay = self.retry_backoff * 2 ** attempt * random.uniform(0.5, 1.0)
+                logger.warning(f"Database write failed ({e}), retrying in {delay:.2f}s")
+                self._retries += 1
+                await asyncio.sleep(delay)
+                continue
+
+            elapsed = time.perf_counter() - start
+            self._written += len(batch)
+            self._batches += 1
+            self._flush_seconds += elapsed
+            self._max_flush_seconds = max(self._max_flush_seconds, elapsed)
+            self._last_flush_seconds = elapsed
+            get_metrics().stage_seconds.observe(elapsed, stage="database")
+            logger.info(f"Wrote {len(batch)} analysis results to database in {elapsed * 1000:.0f} ms")
+            return
+
+        await self._spool(batch)
+
+    async def _replay(self) -> None:
+        # Replay anything left over from a previous run straight away
+        delay = 0.0
+        while True:
+            await asyncio.sleep(delay)
+            pending = await asyncio.to_thread(self.spool.peek, self.batch_size)
+            if not pending:
+                delay = self.replay_interval
+                continue
+
+            try:
+                await insert_analysis_records([record for _, record in pending])
+            except Exception as e:
+                delay = min(max(delay, self.replay_interval) * 2, self.MAX_REPLAY_INTERVAL_SECONDS)
+                logger.warning(f"Replaying spooled results failed ({e}), next attempt in {delay:.0f}s")
+                continue
+
+            await asyncio.to_thread(self.spool.remove, [row_id for row_id, _ in pending])
+            self._replayed += len(pending)
+            logger.info(f"Replayed {len(pending)} spooled analysis results")
+            # Keep going without waiting while a backlog remains
+            delay = 0.0 if len(pending) == self.batch_size else self.replay_interval
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth, spool size and flush latency (reads the spool; call off the event loop)."""
+        return {
+            "queue_depth": self._queue.qsize(),
+            "spool_depth": self.spool.count(),
+            "written": self._written,
+            "batches": self._batches,
+            "retries": self._retries,
+            "spooled": self._spooled,
+            "replayed": self._replayed,
+            "avg_flush_ms": round(self._flush_seconds / self._batches * 1000, 2) if self._batches else 0.0,
+            "max_flush_ms": round(self._max_flush_seconds * 1000, 2),
+            "last_flush_ms": round(self._last_flush_seconds * 1000, 2),
+        }
+
+
+@lru_cache
+def get_result_writer() -> ResultWriter:
+    """Get the shared result writer configured from settings."""
+    settings = get_settings()
+    return ResultWriter(
+        WriteSpool(Path(settings.db_spool_path)),
+        batch_size=settings.db_write_batch_size,
+        flush_interval=settings.db_write_flush_interval_seconds,
+        max_retries=settings.db_write_max_retries,
+        retry_backoff=settings.db_write_retry_backoff_seconds,
+        replay_interval=settings.db_replay_interval_seconds
+    )
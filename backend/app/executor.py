@@ -0,0 +1,485 @@
+"""
+Pipeline Executor
+Runs the CPU-bound analysis pipeline off the event loop.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import random
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, NamedTuple
+from uuid import UUID
+
+import numpy as np
+
+from app.config import get_settings
+from app.metrics import get_metrics
+from app.models import AnalysisResult
+from app.analysis.probe import AudioProbe
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineBusyError(Exception):
+    """Raised when the executor queue is full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Analysis queue is full")
+        self.retry_after = retry_after
+
+
+class PipelineReport(NamedTuple):
+    """What a pipeline run sends back to the API process."""
+    result: AnalysisResult
+    stage_seconds: dict[str, float]
+    wall_seconds: float
+    model_load_seconds: float | None = None
+
+
+# Set in worker processes until their model load time has been reported
+_unreported_load_seconds: float | None = None
+
+
+def _warm_up(seconds: float) -> None:
+    """Run one synthetic recording through the pipeline; failures are logged, not raised."""
+    if seconds <= 0:
+        return
+    from app.analysis.pipeline import warm_up_pipeline
+    try:
+        elapsed = warm_up_pipeline(seconds)
+        logger.info(f"Pipeline warm-up run took {elapsed:.2f}s")
+    except Exception as e:
+        logger.warning(f"Pipeline warm-up run failed: {e}")
+
+
+def _start_longform() -> None:
+    """Start this process's long-form chunk workers, if long-form mode is on."""
+    if get_settings().longform_workers <= 0:
+        return
+    from app.analysis.longform import warm_up_longform_executor
+    try:
+        warm_up_longform_executor()
+    except Exception as e:
+        logger.warning(f"Long-form workers failed to start: {e}")
+
+
+def _init_worker(warmup_seconds: float = 0.0) -> None:
+    """Worker process initializer: configure logging, preload Whisper (and the long-form workers) and warm up."""
+    global _unreported_load_seconds
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    from app.analysis.transcription import get_transcriber_pool, use_single_replica
+    use_single_replica()
+    pool = get_transcriber_pool()
+    pool.load()
+    _unreported_load_seconds = pool.load_seconds
+    _start_longform()
+    _warm_up(warmup_seconds)
+
+
+def _prepare_in_process(warmup_seconds: float) -> float | None:
+    """Thread mode counterpart of the worker initializer; returns the model load time."""
+    from app.analysis.transcription import get_transcriber_pool
+    pool = get_transcriber_pool()
+    pool.load()
+    _start_longform()
+    _warm_up(warmup_seconds)
+    return pool.load_seconds
+
+
+def _take_load_seconds() -> float | None:
+    """This worker's model load time, the first time it is asked for."""
+    global _unreported_load_seconds
+    seconds, _unreported_load_seconds = _unreported_load_seconds, None
+    return seconds
+
+
+def _worker_ready() -> float | None:
+    """Completes once a worker has loaded Whisper and warmed up; returns its model load time."""
+    return _take_load_seconds()
+
+
+def _run_pipeline_job(
+    audio_path: str,
+    session_id: str | None,
+    job_id: str | None,
+    probe: AudioProbe | None,
+    profile_reason: str | None = None
+) -> PipelineReport:
+    """
+    Run the analysis pipeline inside a worker, reporting stages to the job store.
+    
+    With a `profile_reason`, the run is profiled and its top functions are
+    stored under the session ID.
+    """
+    from app.analysis.pipeline import AnalysisPipeline
+    from app.profiling import PipelineProfiler, get_profile_store, profile_record
+    
+    on_stage = None
+    if job_id is not None:
+        from app.jobs import get_job_store
+        store = get_job_store()
+        on_stage = lambda stage: store.set_stage(job_id, stage)
+    
+    profiler = PipelineProfiler() if profile_reason is not None else None
+    started = time.perf_counter()
+    pipeline = AnalysisPipeline(UUID(session_id) if session_id else None)
+    result = pipeline.analyze(Path(audio_path), on_stage, probe, profiler)
+    wall_seconds = time.perf_counter() - started
+    
+    if profiler is not None:
+        try:
+            get_profile_store().put(
+                str(pipeline.session_id),
+                profile_record(profiler, profile_reason, wall_seconds, pipeline.stage_seconds())
+            )
+        except Exception as e:
+            logger.warning(f"Failed to store profile for session {pipeline.session_id}: {e}")
+    
+    return PipelineReport(
+        result,
+        pipeline.stage_seconds(),
+        wall_seconds,
+        # Recycled workers load the model again; each reports its own load once
+        _take_load_seconds()
+    )
+
+
+def _transcribe_stream_window(samples: np.ndarray, sample_rate: int) -> dict:
+    """Transcribe one window of a live stream inside a worker."""
+    from app.analysis.streaming import transcribe_samples
+    return transcribe_samples(samples, sample_rate)
+
+
+def _run_stream_analysis(
+    samples: np.ndarray,
+    sample_rate: int,
+    windows: list[tuple[float, float]],
+    window_results: list[dict],
+    session_id: str | None
+) -> PipelineReport:
+    """Finish a live stream inside a worker: transcribe the tail and run the pipeline."""
+    from app.analysis.streaming import analyze_stream
+
+    started = time.perf_counter()
+    result, stage_seconds = analyze_stream(
+        samples, sample_rate, windows, window_results, UUID(session_id) if session_id else None
+    )
+    return PipelineReport(
+        result,
+        stage_seconds,
+        time.perf_counter() - started,
+        _take_load_seconds()
+    )
+
+
+class PipelineExecutor:
+    """
+    Managed execution mode for the analysis pipeline.
+
+    With `workers > 0` jobs run in a pool of spawned processes that each
+    preload Whisper and are recycled after `max_tasks_per_worker` jobs.
+    With `workers == 0` jobs run on `threads` background threads in this
+    process, sharing its transcriber replicas. Either way, at most
+    `concurrency + queue_size` calls (jobs, and the transcription windows
+    and final analysis of live streams) are admitted at once; further
+    calls raise PipelineBusyError.
+
+    A `profile_sample_rate` fraction of runs (and any run submitted with
+    `profile=True`) is profiled; see `app.profiling`.
+
+    `start` loads Whisper and runs a `warmup_seconds` synthetic recording
+    through the pipeline in the background: in every worker process at
+    once, or on one pipeline thread. `ready()` turns true when that has
+    finished (in process mode, once a worker has warmed up while the rest
+    warm up alongside it), and `time_to_ready` records how long it took.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_tasks_per_worker: int,
+        queue_size: int,
+        retry_after_seconds: int,
+        threads: int = 1,
+        profile_sample_rate: float = 0.0,
+        warmup_seconds: float = 0.0
+    ):
+        self.workers = workers
+        self.threads = max(threads, 1)
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.capacity = self.concurrency + queue_size
+        self.retry_after_seconds = retry_after_seconds
+        self.profile_sample_rate = profile_sample_rate
+        self.warmup_seconds = warmup_seconds
+        self.time_to_ready: float | None = None
+
+        self._pool: Executor | None = None
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+
+        self._ready = False
+        self._ready_lock = threading.Lock()
+        self._restart_lock = threading.Lock()
+        self._warming = 0
+        self._started_at = 0.0
+
+    @property
+    def uses_processes(self) -> bool:
+        """Whether jobs run in worker processes."""
+        return self.workers > 0
+
+    @property
+    def concurrency(self) -> int:
+        """Number of jobs that run at the same time."""
+        return self.workers if self.uses_processes else self.threads
+
+    def _create_pool(self) -> Executor:
+        """Create the underlying pool for the configured mode."""
+        if not self.uses_processes:
+            return ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="pipeline")
+
+        # max_tasks_per_child requires a non-fork start method
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.warmup_seconds,),
+            max_tasks_per_child=self.max_tasks_per_worker or None
+        )
+
+    def start(self) -> None:
+        """Start the pool; Whisper loading and warm-up begin immediately in the background."""
+        if self._pool is not None:
+            return
+
+        self._pool = self._create_pool()
+        self._ready = False
+        self._started_at = time.monotonic()
+
+        if self.uses_processes:
+            logger.info(f"Starting {self.workers} pipeline worker processes")
+            # One task per worker: each submission spawns another worker, so all of them warm up in parallel
+            futures = [self._pool.submit(_worker_ready) for _ in range(self.workers)]
+        else:
+            logger.info(f"Running pipeline on {self.threads} background thread(s)")
+            futures = [self._pool.submit(_prepare_in_process, self.warmup_seconds)]
+
+        self._warming = len(futures)
+        for future in futures:
+            future.add_done_callback(self._on_worker_ready)
+
+        batch_size = get_settings().encoder_batch_size
+        if batch_size > 1 and (self.uses_processes or self.threads <= 1):
+            logger.warning(
+                f"ENCODER_BATCH_SIZE={batch_size} has no effect: encoder batching needs several "
+                f"transcriber replicas in one process, i.e. PIPELINE_WORKERS=0 with TRANSCRIBER_REPLICAS > 1"
+            )
+
+    def _on_worker_ready(self, future) -> None:
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            logger.error(f"Pipeline worker failed to start: {future.exception()}")
+            return
+
+        if future.result() is not None:
+            get_metrics().model_load_seconds.observe(future.result())
+
+        with self._ready_lock:
+            self._warming -= 1
+            if self._warming > 0 or self._ready:
+                return
+            self._ready = True
+            self.time_to_ready = time.monotonic() - self._started_at
+
+        get_metrics().time_to_ready_seconds.set(self.time_to_ready)
+        logger.info(f"Pipeline ready {self.time_to_ready:.2f}s after start")
+
+    def shutdown(self) -> None:
+        """Stop the pool, cancelling queued jobs."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _restart(self, failed_pool: Executor) -> None:
+        """Replace `failed_pool`, unless a caller that saw the same failure already did."""
+        with self._restart_lock:
+            if self._pool is not failed_pool:
+                return
+            logger.error("Pipeline worker pool broken, restarting")
+            self.shutdown()
+            self.start()
+
+    def ready(self) -> bool:
+        """Whether Whisper is loaded and warmed up wherever jobs will run."""
+        return self._ready
+
+    def model_loaded(self) -> bool:
+        """Whether Whisper is loaded wherever jobs will run."""
+        if self.uses_processes:
+            return self._ready
+        from app.analysis.transcription import get_transcriber_pool
+        return get_transcriber_pool().is_loaded()
+
+    def has_capacity(self) -> bool:
+        """Whether another call would currently be admitted."""
+        return self._pending < self.capacity
+
+    async def _call(self, func, *args):
+        """
+        Run `func(*args)` on the pool, subject to the admission limit.
+
+        Raises:
+            PipelineBusyError: If the queue is full.
+        """
+        if self._pending >= self.capacity:
+            self._rejected += 1
+            raise PipelineBusyError(self.retry_after_seconds)
+
+        self.start()
+        loop = asyncio.get_running_loop()
+        pool = self._pool
+        self._pending += 1
+        try:
+            return await loop.run_in_executor(pool, func, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM kill); replace the pool for later jobs
+            self._restart(pool)
+            raise
+        finally:
+            self._pending -= 1
+
+    async def _analyze(self, func, *args) -> AnalysisResult:
+        """Run a whole analysis through `_call`, recording its outcome and stage timings."""
+        metrics = get_metrics()
+        try:
+            report = await self._call(func, *args)
+        except PipelineBusyError:
+            raise
+        except Exception:
+            self._failed += 1
+            metrics.analyses.inc(outcome="failed")
+            raise
+
+        self._completed += 1
+        metrics.analyses.inc(outcome="completed")
+        metrics.observe_stages(report.stage_seconds)
+        metrics.pipeline_seconds.observe(report.wall_seconds)
+        metrics.audio_seconds.inc(report.result.audio_duration)
+        if report.model_load_seconds is not None:
+            metrics.model_load_seconds.observe(report.model_load_seconds)
+        return report.result
+
+    async def submit(
+        self,
+        audio_path: Path,
+        session_id: UUID | None = None,
+        job_id: UUID | None = None,
+        probe: AudioProbe | None = None,
+        profile: bool = False
+    ) -> AnalysisResult:
+        """
+        Run the analysis pipeline without blocking the event loop.
+
+        Args:
+            audio_path: Path to the audio file.
+            session_id: Optional session ID.
+            job_id: Optional job whose current stage should be recorded.
+            probe: Header probe from the upload preflight, if one was run.
+            profile: Profile this run regardless of the sampling rate.
+
+        Returns:
+            Complete analysis result.
+
+        Raises:
+            PipelineBusyError: If the queue is full.
+        """
+        profile_reason = None
+        if profile:
+            profile_reason = "requested"
+        elif self.profile_sample_rate > 0 and random.random() < self.profile_sample_rate:
+            profile_reason = "sampled"
+
+        return await self._analyze(
+            _run_pipeline_job,
+            str(audio_path),
+            str(session_id) if session_id else None,
+            str(job_id) if job_id else None,
+            probe,
+            profile_reason
+        )
+
+    async def transcribe_window(self, samples: np.ndarray, sample_rate: int) -> dict:
+        """
+        Transcribe one window of a live stream where jobs run.
+
+        Raises:
+            PipelineBusyError: If the queue is full.
+        """
+        return await self._call(_transcribe_stream_window, samples, sample_rate)
+
+    async def analyze_stream(
+        self,
+        samples: np.ndarray,
+        sample_rate: int,
+        windows: list[tuple[float, float]],
+        window_results: list[dict],
+        session_id: UUID | None = None
+    ) -> AnalysisResult:
+        """
+        Finish a live stream where jobs run (see `app.analysis.streaming.analyze_stream`).
+
+        Raises:
+            PipelineBusyError: If the queue is full.
+        """
+        return await self._analyze(
+            _run_stream_analysis,
+            samples,
+            sample_rate,
+            windows,
+            window_results,
+            str(session_id) if session_id else None
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """Current queue and throughput counters."""
+        running = min(self._pending, self.concurrency)
+        return {
+            "mode": "process" if self.uses_processes else "thread",
+            "workers": self.workers,
+            "threads": self.threads,
+            "capacity": self.capacity,
+            "in_flight": running,
+            "queued": self._pending - running,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "ready": self._ready,
+            "time_to_ready_seconds": round(self.time_to_ready, 3) if self.time_to_ready is not None else None,
+        }
+
+
+@lru_cache
+def get_pipeline_executor() -> PipelineExecutor:
+    """Get the shared pipeline executor configured from settings."""
+    settings = get_settings()
+    return PipelineExecutor(
+        workers=settings.pipeline_workers,
+        max_tasks_per_worker=settings.pipeline_max_tasks_per_worker,
+        queue_size=settings.pipeline_queue_size,
+        retry_after_seconds=settings.pipeline_retry_after_seconds,
+        threads=settings.transcriber_replicas,
+        profile_sample_rate=settings.profile_sample_rate,
+        warmup_seconds=settings.pipeline_warmup_seconds
+    )
@@ -0,0 +1,486 @@
+"""
+Analysis Job Queue
+Persists analysis jobs in SQLite so they survive restarts.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+from uuid import UUID, uuid4
+
+from app.config import get_settings
+from app.models import AnalysisResult, JobStatus
+from app.cache import get_result_cache
+from app.analysis.probe import AudioPolicyError, AudioProbe
+from app.executor import PipelineBusyError, PipelineExecutor, get_pipeline_executor
+
+logger = logging.getLogger(__name__)
+
+
+class JobState:
+    """Job lifecycle states."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class JobFailedError(Exception):
+    """Raised when a job finishes unsuccessfully."""
+
+    def __init__(self, detail: str, status_code: int = 500):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+class Job(NamedTuple):
+    """A row of the jobs table."""
+    job_id: UUID
+    state: str
+    stage: Optional[str]
+    audio_path: str
+    save_to_db: bool
+    result: Optional[str]
+    error: Optional[str]
+    error_status: Optional[int]
+    cache_key: Optional[str]
+    probe: Optional[AudioProbe]
+    profile: bool
+    created_at: datetime
+    updated_at: datetime
+
+    def to_status(self) -> JobStatus:
+        """Public view of the job without its payload."""
+        return JobStatus(
+            job_id=self.job_id,
+            state=self.state,
+            stage=self.stage,
+            error=self.error,
+            created_at=self.created_at,
+            updated_at=self.updated_at
+        )
+
+    def get_result(self) -> AnalysisResult:
+        """Parse the stored analysis result."""
+        return AnalysisResult.model_validate_json(self.result)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    stage TEXT,
+    audio_path TEXT NOT NULL,
+    save_to_db INTEGER NOT NULL,
+    result TEXT,
+    error TEXT,
+    error_status INTEGER,
+    cache_key TEXT,
+    probe TEXT,
+    profile INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    lease_until TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_state_created ON jobs(state, created_at);
+"""
+
+
+class JobStore:
+    """
+    SQLite-backed job table.
+
+    Each call opens its own short-lived connection, so the store can be
+    used from the event loop's worker threads and from pipeline worker
+    processes (which report the current stage) at the same time.
+
+    Several API processes may share the file. A claimed job records its
+    owner and a lease that the owner keeps renewing; only jobs whose lease
+    has run out (their owner died) are returned to the queue.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            
+            # Databases created by earlier versions lack the newer columns
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, definition in (
+                ("cache_key", "TEXT"),
+                ("probe", "TEXT"),
+                ("profile", "INTEGER NOT NULL DEFAULT 0"),
+                ("owner", "TEXT"),
+                ("lease_until", "TEXT"),
+            ):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection that commits on success and always closes."""
+        conn = sqlite3.connect(self.db_path, timeout=10.0)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Job:
+        return Job(
+            job_id=UUID(row["job_id"]),
+            state=row["state"],
+            stage=row["stage"],
+            audio_path=row["audio_path"],
+            save_to_db=bool(row["save_to_db"]),
+            result=row["result"],
+            error=row["error"],
+            error_status=row["error_status"],
+            cache_key=row["cache_key"],
+            probe=AudioProbe(**json.loads(row["probe"])) if row["probe"] else None,
+            profile=bool(row["profile"]),
+            created_at=datetime.fromisoformat(row["created_at"]),
+            updated_at=datetime.fromisoformat(row["updated_at"])
+        )
+
+    def create(
+        self,
+        job_id: UUID,
+        audio_path: Path,
+        save_to_db: bool,
+        cache_key: str | None = None,
+        probe: AudioProbe | None = None,
+        profile: bool = False
+    ) -> Job:
+        """Enqueue a new job for an already spooled (and optionally probed) audio file."""
+        now = datetime.utcnow().isoformat()
+        probe_json = json.dumps(probe._asdict()) if probe else None
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, state, audio_path, save_to_db, cache_key, probe, profile, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (str(job_id), JobState.QUEUED, str(audio_path), int(save_to_db), cache_key, probe_json, int(profile), now, now)
+            )
+        return self.get(job_id)
+    
+    def create_completed(self, result: AnalysisResult, save_to_db: bool) -> Job:
+        """Record a job that was answered without running the pipeline (a cache hit)."""
+        now = datetime.utcnow().isoformat()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, state, audio_path, save_to_db, result, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (str(result.session_id), JobState.COMPLETED, "", int(save_to_db), result.model_dump_json(), now, now)
+            )
+        return self.get(result.session_id)
+
+    def get(self, job_id: UUID) -> Job | None:
+        """Look up a job by ID."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (str(job_id),)).fetchone()
+        return self._to_job(row) if row else None
+
+    def claim_next(self, owner: str, lease_seconds: float) -> Job | None:
+        """Atomically move the oldest queued job to running under a lease held by `owner`."""
+        now = datetime.utcnow()
+        with self._connect() as conn:
+            row = conn.execute(
+                "UPDATE jobs SET state = ?, owner = ?, lease_until = ?, updated_at = ? WHERE job_id = ("
+                "SELECT job_id FROM jobs WHERE state = ? ORDER BY created_at LIMIT 1"
+                ") RETURNING *",
+                (
+                    JobState.RUNNING,
+                    owner,
+                    (now + timedelta(seconds=lease_seconds)).isoformat(),
+                    now.isoformat(),
+                    JobState.QUEUED
+                )
+            ).fetchone()
+        return self._to_job(row) if row else None
+
+    def renew_leases(self, owner: str, lease_seconds: float) -> int:
+        """Extend the leases of every job `owner` is running."""
+        lease_until = (datetime.utcnow() + timedelta(seconds=lease_seconds)).isoformat()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE state = ? AND owner = ?",
+                (lease_until, JobState.RUNNING, owner)
+            )
+        return cursor.rowcount
+
+    def requeue(self, job_id: UUID) -> None:
+        """Return a claimed job to the queue, keeping its place."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, stage = NULL, owner = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE job_id = ?",
+                (JobState.QUEUED, datetime.utcnow().isoformat(), str(job_id))
+            )
+
+    def set_stage(self, job_id: UUID | str, stage: str) -> None:
+        """Record the pipeline stage a running job has reached."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET stage = ?, updated_at = ? WHERE job_id = ?",
+                (stage, datetime.utcnow().isoformat(), str(job_id))
+            )
+
+    def complete(self, job_id: UUID, result: AnalysisResult) -> None:
+        """Store the result of a finished job."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, stage = NULL, result = ?, updated_at = ? WHERE job_id = ?",
+                (JobState.COMPLETED, result.model_dump_json(), datetime.utcnow().isoformat(), str(job_id))
+            )
+
+    def fail(self, job_id: UUID, error: str, status_code: int = 500) -> None:
+        """Mark a job as failed."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, error_status = ?, updated_at = ? WHERE job_id = ?",
+                (JobState.FAILED, error, status_code, datetime.utcnow().isoformat(), str(job_id))
+            )
+
+    def requeue_expired(self) -> int:
+        """Return running jobs whose owner stopped renewing their lease to the queue."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = ?, stage = NULL, owner = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE state = ? AND (lease_until IS NULL OR lease_until < ?)",
+                (JobState.QUEUED, datetime.utcnow().isoformat(), JobState.RUNNING, datetime.utcnow().isoformat())
+            )
+        return cursor.rowcount
+
+    def release(self, owner: str) -> int:
+        """Return every job `owner` is running to the queue (on a clean shutdown)."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = ?, stage = NULL, owner = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE state = ? AND owner = ?",
+                (JobState.QUEUED, datetime.utcnow().isoformat(), JobState.RUNNING, owner)
+            )
+        return cursor.rowcount
+
+    def count(self, state: str) -> int:
+        """Number of jobs in a given state."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT COUNT(*) FROM jobs WHERE state = ?", (state,)).fetchone()
+        return row[0]
+
+    def prune(self, older_than: datetime) -> int:
+        """Delete finished jobs last updated before `older_than`."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE state IN (?, ?) AND updated_at < ?",
+                (JobState.COMPLETED, JobState.FAILED, older_than.isoformat())
+            )
+        return cursor.rowcount
+
+
+def save_analysis_result(result: AnalysisResult) -> None:
+    """Queue a finished result for the background database writer."""
+    from app.db_writer import get_result_writer
+    get_result_writer().submit(result)
+
+
+class JobDispatcher:
+    """
+    Feeds queued jobs to the pipeline executor.
+
+    Claims at most one job per available worker, so jobs stay `queued` in
+    SQLite until a worker is actually free, and wakes any request that is
+    waiting on a job when it finishes. A job the executor turns away
+    because live streams hold its capacity goes back to the queue, and
+    claiming pauses for a backoff that doubles up to the executor's
+    Retry-After while it stays busy.
+    """
+
+    PRUNE_INTERVAL_SECONDS = 3600
+
+    def __init__(
+        self,
+        store: JobStore,
+        executor: PipelineExecutor,
+        poll_interval: float = 1.0,
+        lease_seconds: float = 60.0
+    ):
+        self.store = store
+        self.executor = executor
+        self.concurrency = executor.concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        # Identifies this process's claims among all processes sharing the job file
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        self._active: set[asyncio.Task] = set()
+        self._waiters: dict[UUID, list[asyncio.Future]] = {}
+        self._last_prune = 0.0
+        self._last_heartbeat = 0.0
+        self._backoff = 0.0
+        self._paused_until = 0.0
+
+    async def start(self) -> None:
+        """Start dispatching; jobs abandoned by dead processes are requeued as their leases expire."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop dispatching and return this process's running jobs to the queue."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in list(self._active):
+            task.cancel()
+        released = await asyncio.to_thread(self.store.release, self.owner)
+        if released:
+            logger.info(f"Returned {released} running jobs to the queue")
+
+    def notify(self) -> None:
+        """Wake the dispatcher after a job is enqueued."""
+        self._wakeup.set()
+
+    async def wait_for(self, job_id: UUID) -> AnalysisResult:
+        """
+        Wait until a job finishes.
+
+        Args:
+            job_id: The job to wait on.
+
+        Returns:
+            The job's analysis result.
+
+        Raises:
+            JobFailedError: If the job failed.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(job_id, []).append(future)
+
+        # The job may have finished before the waiter was registered
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is not None and job.state in (JobState.COMPLETED, JobState.FAILED):
+            self._resolve(job_id, job)
+
+        return await future
+
+    def _resolve(self, job_id: UUID, job: Job) -> None:
+        for future in self._waiters.pop(job_id, []):
+            if future.done():
+                continue
+            if job.state == JobState.COMPLETED:
+                future.set_result(job.get_result())
+            else:
+                future.set_exception(JobFailedError(job.error or "Analysis failed", job.error_status or 500))
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+
+            if time.monotonic() - self._last_prune > self.PRUNE_INTERVAL_SECONDS:
+                self._last_prune = time.monotonic()
+                cutoff = datetime.utcnow() - timedelta(hours=get_settings().job_retention_hours)
+                pruned = await asyncio.to_thread(self.store.prune, cutoff)
+                if pruned:
+                    logger.info(f"Pruned {pruned} finished jobs")
+
+            if time.monotonic() - self._last_heartbeat > self.lease_seconds / 3:
+                self._last_heartbeat = time.monotonic()
+                await asyncio.to_thread(self.store.renew_leases, self.owner, self.lease_seconds)
+                requeued = await asyncio.to_thread(self.store.requeue_expired)
+                if requeued:
+                    logger.info(f"Requeued {requeued} jobs whose owner stopped renewing its lease")
+
+            while len(self._active) < self.concurrency and time.monotonic() >= self._paused_until:
+                job = await asyncio.to_thread(self.store.claim_next, self.owner, self.lease_seconds)
+                if job is None:
+                    break
+                task = asyncio.create_task(self._process(job))
+                self._active.add(task)
+                task.add_done_callback(self._on_done)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self._active.discard(task)
+        self._wakeup.set()
+
+    async def _process(self, job: Job) -> None:
+        logger.info(f"Processing job {job.job_id}")
+
+        try:
+            result = await self.executor.submit(
+                Path(job.audio_path),
+                job.job_id,
+                job_id=job.job_id,
+                probe=job.probe,
+                profile=job.profile
+            )
+
+            self._backoff = 0.0
+            await asyncio.to_thread(self.store.complete, job.job_id, result)
+
+            if job.cache_key:
+                await asyncio.to_thread(get_result_cache().put, job.cache_key, result)
+
+            if job.save_to_db:
+                save_analysis_result(result)
+
+        except asyncio.CancelledError:
+            raise
+        except PipelineBusyError as e:
+            self._backoff = min(max(self._backoff * 2, self.poll_interval), e.retry_after)
+            self._paused_until = time.monotonic() + self._backoff
+            logger.info(f"Executor busy, requeueing job {job.job_id} (retrying in {self._backoff:.1f}s)")
+            await asyncio.to_thread(self.store.requeue, job.job_id)
+        except (JobFailedError, AudioPolicyError) as e:
+            await asyncio.to_thread(self.store.fail, job.job_id, e.detail, e.status_code)
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {e}", exc_info=True)
+            await asyncio.to_thread(self.store.fail, job.job_id, f"Analysis failed: {e}", 500)
+        finally:
+            finished = await asyncio.to_thread(self.store.get, job.job_id)
+            if finished is not None and finished.state in (JobState.COMPLETED, JobState.FAILED):
+                try:
+                    os.remove(job.audio_path)
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    logger.warning(f"Failed to clean up job audio: {e}")
+                self._resolve(job.job_id, finished)
+
+    def stats(self) -> dict[str, int]:
+        """Job queue counters."""
+        return {
+            "queued": self.store.count(JobState.QUEUED),
+            "running": len(self._active),
+        }
+
+
+@lru_cache
+def get_job_store() -> JobStore:
+    """Get the shared job store configured from settings."""
+    return JobStore(Path(get_settings().job_db_path))
+
+
+@lru_cache
+def get_job_dispatcher() -> JobDispatcher:
+    """Get the shared job dispatcher."""
+    return JobDispatcher(get_job_store(), get_pipeline_executor(), lease_seconds=get_settings().job_lease_seconds)
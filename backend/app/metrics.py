@@ -0,0 +1,307 @@
+"""
+Runtime Metrics
+Counters, gauges and histograms rendered in the Prometheus text exposition format.
+"""
+
+import bisect
+import threading
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Iterable
+
+# Seconds; covers sub-millisecond scoring up to multi-minute transcription
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(ABC):
+    """A named metric family whose samples are keyed by label values."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> Labels:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple((name, str(labels[name])) for name in self.label_names)
+
+    @abstractmethod
+    def samples(self) -> Iterable[tuple[str, Labels, float]]:
+        """(sample name, labels, value) for every series of the family."""
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing total."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def mirror(self, total: float, **labels: str) -> None:
+        """Report a running total kept by another component."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = total
+
+    def samples(self) -> Iterable[tuple[str, Labels, float]]:
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: dict[Labels, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self) -> Iterable[tuple[str, Labels, float]]:
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count of observations."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last), sum]
+        self._values: dict[Labels, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def samples(self) -> Iterable[tuple[str, Labels, float]]:
+        with self._lock:
+            snapshot = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+
+        samples = []
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", key + (("le", _format_value(float(bound))),), cumulative))
+            samples.append((f"{self.name}_sum", key, total))
+            samples.append((f"{self.name}_count", key, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """Set of metric families rendered together for a scrape."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Metrics:
+    """
+    The application's metrics.
+
+    Pipeline stage durations come from wherever the stage ran (worker
+    processes send theirs back with each result) and are observed here
+    in the API process. Queue, cache and database writer state is read
+    from the owning components at scrape time via `collect`.
+    """
+
+    def __init__(self):
+        self.registry = MetricsRegistry()
+        register = self.registry.register
+
+        self.stage_seconds = register(Histogram(
+            "bigkas_stage_duration_seconds",
+            "Time spent in each analysis stage (decode, transcription, acoustics, pauses, fluency, scoring, database)",
+            ("stage",)
+        ))
+        self.pipeline_seconds = register(Histogram(
+            "bigkas_pipeline_duration_seconds",
+            "Wall time of a whole analysis pipeline run"
+        ))
+        self.audio_seconds = register(Counter(
+            "bigkas_audio_processed_seconds_total",
+            "Seconds of audio analyzed; rate() gives audio-seconds processed per second"
+        ))
+        self.analyses = register(Counter(
+            "bigkas_analyses_total",
+            "Analysis pipeline runs by outcome",
+            ("outcome",)
+        ))
+        self.model_load_seconds = register(Histogram(
+            "bigkas_model_load_seconds",
+            "Time to load the transcriber replicas, per process that loaded them",
+            buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+        ))
+        self.time_to_ready_seconds = register(Gauge(
+            "bigkas_time_to_ready_seconds",
+            "Seconds from pipeline start until Whisper was loaded and warmed up"
+        ))
+        self.http_in_flight = register(Gauge(
+            "bigkas_http_requests_in_flight",
+            "HTTP requests currently being handled"
+        ))
+        self.http_requests = register(Counter(
+            "bigkas_http_requests_total",
+            "HTTP requests handled, by method and status code",
+            ("method", "status")
+        ))
+        self.queue_depth = register(Gauge(
+            "bigkas_queue_depth",
+            "Jobs waiting, by queue (jobs: persistent job queue, pipeline: admitted to the executor, db_writer: results not yet written, db_spool: results spooled during outages)",
+            ("queue",)
+        ))
+        self.pipeline_in_flight = register(Gauge(
+            "bigkas_pipeline_in_flight",
+            "Analysis jobs currently running"
+        ))
+        self.cache_lookups = register(Counter(
+            "bigkas_cache_lookups_total",
+            "Cache lookups by cache and result (hit rate = hits / all lookups)",
+            ("cache", "result")
+        ))
+
+    def observe_stages(self, stage_seconds: dict[str, float]) -> None:
+        for stage, seconds in stage_seconds.items():
+            self.stage_seconds.observe(seconds, stage=stage)
+
+    def collect(self, state: dict) -> None:
+        """
+        Refresh scrape-time values from component statistics.
+
+        Args:
+            state: The same component stats served by `/stats`.
+        """
+        pipeline, jobs, writer = state["pipeline"], state["jobs"], state["db_writer"]
+        for queue, depth in (
+            ("jobs", jobs["queued"]),
+            ("pipeline", pipeline["queued"]),
+            ("db_writer", writer["queue_depth"]),
+            ("db_spool", writer["spool_depth"]),
+        ):
+            self.queue_depth.set(depth, queue=queue)
+        self.pipeline_in_flight.set(pipeline["in_flight"])
+
+        cache, records = state["cache"], state["record_cache"]
+        for name, result, total in (
+            ("result", "memory_hit", cache["memory_hits"]),
+            ("result", "disk_hit", cache["disk_hits"]),
+            ("result", "miss", cache["misses"]),
+            ("record", "hit", records["hits"]),
+            ("record", "miss", records["misses"]),
+        ):
+            self.cache_lookups.mirror(total, cache=name, result=result)
+
+    def render(self) -> str:
+        return self.registry.render()
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting HTTP requests and tracking how many are in flight."""
+
+    def __init__(self, app, metrics: "Metrics"):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        self.metrics.http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.metrics.http_in_flight.dec()
+            self.metrics.http_requests.inc(method=scope["method"], status=status)
+
+
+@lru_cache
+def get_metrics() -> Metrics:
+    """Get the shared metrics."""
+    return Metrics()
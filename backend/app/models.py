@@ -4,7 +4,7 @@ Defines all data structures used in the API.
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field, ConfigDict
@@ -105,6 +105,50 @@ class AnalysisResult(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class AnalysisPage(BaseModel):
+    """One page of stored analysis records."""
+    
+    items: list[dict[str, Any]] = Field(..., description="Analysis records, newest first")
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page; null on the last page")
+
+
+class JobStatus(BaseModel):
+    """Status of an asynchronous analysis job."""
+    
+    job_id: UUID = Field(..., description="Job identifier (also the analysis session ID)")
+    state: str = Field(..., description="queued, running, completed or failed")
+    stage: Optional[str] = Field(None, description="Pipeline stage currently running")
+    error: Optional[str] = Field(None, description="Failure reason if the job failed")
+    created_at: datetime
+    updated_at: datetime
+    
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "job_id": "0f8fad5b-d9cb-469f-a165-70867728950e",
+            "state": "running",
+            "stage": "transcription",
+            "error": None,
+            "created_at": "2024-01-15T10:30:00Z",
+            "updated_at": "2024-01-15T10:30:04Z"
+        }
+    })
+
+
+class StreamingMetrics(BaseModel):
+    """Interim metrics pushed while audio is still streaming in."""
+    
+    duration: float = Field(..., description="Seconds of audio received so far")
+    pitch_mean: float = Field(..., description="Running mean pitch in Hz")
+    pitch_std: float = Field(..., description="Running pitch standard deviation in Hz")
+    pause_count: int = Field(..., description="Pauses detected so far")
+    total_pause_duration: float = Field(..., description="Total pause time so far in seconds")
+    pause_ratio: float = Field(..., description="Pause time divided by duration")
+    transcribed_duration: float = Field(..., description="Seconds of audio transcribed so far")
+    word_count: int = Field(..., description="Words in the transcribed audio")
+    words_per_minute: float = Field(..., description="Speaking rate over the most recent transcribed windows")
+    filler_count: int = Field(..., description="Filler words in the transcribed audio")
+
+
 class HealthResponse(BaseModel):
     """Health check response."""
     
@@ -0,0 +1,165 @@
+"""
+Request Profiling
+Profiles sampled or explicitly requested pipeline runs and keeps their hottest functions.
+"""
+
+import cProfile
+import json
+import logging
+import os
+import pstats
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineProfiler:
+    """
+    cProfile across the threads of one pipeline run.
+
+    cProfile only sees the thread it is enabled on (before Python 3.12),
+    and pipeline stages run on the stage graph's worker threads, so
+    `profile()` starts a separate profiler on whichever thread enters it
+    and `top()` merges them all. From 3.12 only one profiler may be active
+    per process, so profiled runs execute their stages one at a time, and
+    a block that cannot be profiled (another run in this process holds
+    the profiler) simply runs unprofiled: profiling never fails a run.
+    """
+
+    def __init__(self):
+        self._profiles: list[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self.skipped = 0
+
+    @contextmanager
+    def profile(self) -> Iterator[None]:
+        """Profile the enclosed block on the current thread, if a profiler can be enabled."""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            logger.warning(f"Running without profiling: {e}")
+            profile = None
+
+        if profile is None:
+            with self._lock:
+                self.skipped += 1
+            yield
+            return
+
+        with self._lock:
+            self._profiles.append(profile)
+        try:
+            yield
+        finally:
+            profile.disable()
+
+    def top(self, limit: int) -> list[dict[str, Any]]:
+        """The `limit` functions with the most cumulative time, across all threads."""
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return []
+
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+        return [
+            {
+                "function": pstats.func_std_string(func),
+                "calls": calls,
+                "primitive_calls": primitive_calls,
+                "own_seconds": round(own, 6),
+                "cumulative_seconds": round(cumulative, 6),
+            }
+            for func, (primitive_calls, calls, own, cumulative, _) in rows
+        ]
+
+
+class ProfileStore:
+    """
+    Recent profiles as one JSON file per session.
+
+    Files are shared by the API process and the pipeline workers; the
+    oldest are deleted once there are more than `max_profiles`.
+    """
+
+    def __init__(self, profile_dir: Path, max_profiles: int):
+        self.profile_dir = profile_dir
+        self.max_profiles = max_profiles
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, session_id: str) -> Path:
+        return self.profile_dir / f"{session_id}.json"
+
+    def put(self, session_id: str, profile: dict[str, Any]) -> None:
+        """Store a profile, replacing any earlier one for the session."""
+        path = self._path(session_id)
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps({"session_id": session_id, **profile}))
+        os.replace(temp_path, path)
+        self._prune()
+
+    def _prune(self) -> None:
+        paths = sorted(self.profile_dir.glob("*.json"), key=lambda path: path.stat().st_mtime)
+        for path in paths[:max(len(paths) - self.max_profiles, 0)]:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def get(self, session_id: str) -> dict[str, Any] | None:
+        """The stored profile for a session, or None."""
+        try:
+            return json.loads(self._path(session_id).read_text())
+        except FileNotFoundError:
+            return None
+
+    def recent(self, limit: int) -> list[dict[str, Any]]:
+        """Summaries of the newest profiles, newest first."""
+        paths = sorted(self.profile_dir.glob("*.json"), key=lambda path: path.stat().st_mtime, reverse=True)
+        summaries = []
+        for path in paths[:limit]:
+            try:
+                profile = json.loads(path.read_text())
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+            summaries.append({
+                key: profile.get(key)
+                for key in ("session_id", "reason", "created_at", "wall_seconds", "stage_seconds")
+            })
+        return summaries
+
+
+def profile_record(
+    profiler: PipelineProfiler,
+    reason: str,
+    wall_seconds: float,
+    stage_seconds: dict[str, float]
+) -> dict[str, Any]:
+    """The stored form of a finished profile."""
+    return {
+        "reason": reason,
+        "created_at": datetime.utcnow().isoformat(),
+        "wall_seconds": round(wall_seconds, 4),
+        "stage_seconds": {stage: round(seconds, 4) for stage, seconds in stage_seconds.items()},
+        # Blocks that ran while another profiler was active and are missing from the entries
+        "unprofiled_blocks": profiler.skipped,
+        "entries": profiler.top(get_settings().profile_top_entries),
+    }
+
+
+@lru_cache
+def get_profile_store() -> ProfileStore:
+    """Get the shared profile store configured from settings."""
+    settings = get_settings()
+    return ProfileStore(Path(settings.profile_dir), settings.profile_max_stored)
@@ -0,0 +1,250 @@
+"""
+Upload Handling
+Streams uploads to disk in fixed-size chunks with a byte limit.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import zipfile
+import zlib
+from pathlib import Path
+from typing import NamedTuple
+from uuid import uuid4
+
+from fastapi import UploadFile
+
+logger = logging.getLogger(__name__)
+
+# Allowance for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Archive entries are recognized as audio by extension
+AUDIO_SUFFIXES = (".wav", ".mp3")
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured byte limit."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds maximum allowed size ({max_bytes} bytes)")
+        self.max_bytes = max_bytes
+
+
+class SpooledUpload(NamedTuple):
+    """An upload written to disk."""
+    path: Path
+    size: int
+    sha256: str
+
+
+async def spool_upload(
+    upload: UploadFile,
+    dest: Path,
+    max_bytes: int,
+    chunk_size: int = 1024 * 1024
+) -> SpooledUpload:
+    """
+    Copy an upload to `dest` one chunk at a time.
+
+    Only one chunk is held in memory at once, and the SHA-256 of the bytes
+    is computed on the way through so callers don't need a second pass.
+
+    Args:
+        upload: The uploaded file.
+        dest: Destination path.
+        max_bytes: Maximum accepted size.
+        chunk_size: Bytes read per chunk.
+
+    Returns:
+        SpooledUpload with the path, size and hash.
+
+    Raises:
+        UploadTooLargeError: As soon as more than `max_bytes` have been read.
+            The partial file is removed.
+    """
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        with open(dest, "wb") as f:
+            while chunk := await upload.read(chunk_size):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                digest.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+    except BaseException:
+        dest.unlink(missing_ok=True)
+        raise
+
+    return SpooledUpload(path=dest, size=size, sha256=digest.hexdigest())
+
+
+class BatchEntry(NamedTuple):
+    """A recording in a batch upload: spooled to disk, or the reason it was not."""
+    name: str
+    upload: SpooledUpload | None
+    error: str | None = None
+    status_code: int = 422
+
+
+def extract_audio_archive(
+    archive_path: Path,
+    dest_dir: Path,
+    max_entries: int,
+    max_entry_bytes: int,
+    chunk_size: int = 1024 * 1024
+) -> list[BatchEntry]:
+    """
+    Extract the audio files from a zip archive.
+
+    Entries are decompressed one chunk at a time and counted as they are
+    written, so the sizes recorded in the archive are never trusted.
+    Each file is written to `dest_dir` as `<uuid4><suffix>`, so its stem
+    can serve as a job ID. Directories and hidden files (including macOS
+    `__MACOSX` metadata) are skipped.
+
+    Args:
+        archive_path: The uploaded zip file.
+        dest_dir: Directory to extract into.
+        max_entries: Maximum number of files in the archive.
+        max_entry_bytes: Maximum uncompressed size of each file.
+        chunk_size: Bytes decompressed per chunk.
+
+    Returns:
+        One BatchEntry per file, in archive order. Non-audio (422),
+        unextractable (422: encrypted, unsupported compression or
+        corrupt) and oversized (413) files carry an error instead of an
+        upload.
+
+    Raises:
+        zipfile.BadZipFile: If the file is not a zip archive.
+        ValueError: If the archive holds more than `max_entries` files.
+    """
+    entries = []
+
+    with zipfile.ZipFile(archive_path) as archive:
+        members = [
+            member for member in archive.infolist()
+            if not member.is_dir()
+            and not any(part.startswith((".", "__MACOSX")) for part in Path(member.filename).parts)
+        ]
+        if len(members) > max_entries:
+            raise ValueError(f"Archive holds {len(members)} files; at most {max_entries} are allowed")
+
+        for member in members:
+            suffix = Path(member.filename).suffix.lower()
+            if suffix not in AUDIO_SUFFIXES:
+                entries.append(BatchEntry(member.filename, None, f"Unsupported audio format: {suffix or 'no extension'}"))
+                continue
+            if member.flag_bits & 0x1:
+                entries.append(BatchEntry(member.filename, None, "Encrypted archive entries are not supported"))
+                continue
+
+            dest = dest_dir / f"{uuid4()}{suffix}"
+            digest = hashlib.sha256()
+            size = 0
+            try:
+                with archive.open(member) as src, open(dest, "wb") as f:
+                    while chunk := src.read(chunk_size):
+                        size += len(chunk)
+                        if size > max_entry_bytes:
+                            raise UploadTooLargeError(max_entry_bytes)
+                        digest.update(chunk)
+                        f.write(chunk)
+            except UploadTooLargeError as e:
+                dest.unlink(missing_ok=True)
+                entries.append(BatchEntry(member.filename, None, str(e), 413))
+                continue
+            except (RuntimeError, NotImplementedError, zipfile.BadZipFile, zlib.error) as e:
+                # Unsupported compression methods and corrupt data
+                dest.unlink(missing_ok=True)
+                entries.append(BatchEntry(member.filename, None, f"Cannot extract from archive: {e}"))
+                continue
+            except BaseException:
+                dest.unlink(missing_ok=True)
+                raise
+
+            entries.append(BatchEntry(member.filename, SpooledUpload(path=dest, size=size, sha256=digest.hexdigest())))
+
+    return entries
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class UploadLimitMiddleware:
+    """
+    ASGI middleware that rejects oversized request bodies with 413.
+
+    Requests whose Content-Length exceeds the limit are refused before any
+    body is read. Chunked requests are counted as they arrive and aborted
+    once they pass the limit, so the multipart parser never spools the
+    rest of an oversized upload. `path_limits` overrides the limit for
+    specific paths.
+    """
+
+    def __init__(self, app, max_body_bytes: int, path_limits: dict[str, int] | None = None):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.path_limits = path_limits or {}
+
+    async def _reject(self, send, max_body_bytes: int) -> None:
+        body = json.dumps({"detail": f"Request body exceeds maximum allowed size ({max_body_bytes} bytes)"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT"):
+            await self.app(scope, receive, send)
+            return
+
+        max_body_bytes = self.path_limits.get(scope["path"], self.max_body_bytes)
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > max_body_bytes:
+            await self._reject(send, max_body_bytes)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body_bytes:
+                    exceeded = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def limited_send(message):
+            nonlocal response_started
+            # The framework turns the aborted body read into its own error
+            # response; replace it with 413
+            if exceeded:
+                if message["type"] == "http.response.start" and not response_started:
+                    response_started = True
+                    await self._reject(send, max_body_bytes)
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, limited_send)
+        except _BodyTooLarge:
+            if not response_started:
+                await self._reject(send, max_body_bytes)
+        finally:
+            if exceeded:
+                logger.warning(f"Rejected request to {scope['path']}: body exceeds {max_body_bytes} bytes")
@@ -0,0 +1,257 @@
+"""
+Bigkas Batch Analyzer
+Analyzes a directory of recordings offline across a pool of worker processes.
+
+Usage (from backend/):
+    python batch_analyze.py RECORDINGS_DIR --output results.csv [--workers N]
+        [--manifest PATH] [--save-to-db] [--retry-failed]
+
+Writes one row per recording to CSV or Parquet (by the output suffix;
+Parquet needs pyarrow). Progress is appended to a JSON-lines manifest
+(default: OUTPUT.manifest.jsonl) as each file finishes, so an interrupted
+run picks up where it stopped when started again with the same arguments.
+Each entry records the analysis configuration it was produced under;
+entries from a different configuration (model, filler lexicon, scoring
+version, long-form settings) are analyzed again. The output file is
+rebuilt from the manifest at the end of every run.
+
+With --save-to-db, results also go through the same batching database
+writer as the API; anything that cannot be written is spooled and
+replayed by the server.
+"""
+
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from app.cache import config_fingerprint
+from app.database import SupabaseClient, analysis_record
+from app.models import AnalysisResult
+from app.uploads import AUDIO_SUFFIXES
+
+logger = logging.getLogger("batch_analyze")
+
+
+def _init_worker(num_threads: int) -> None:
+    """Worker initializer: split the cores between workers and load the model."""
+    logging.basicConfig(
+        level=logging.WARNING,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    import torch
+    torch.set_num_threads(num_threads)
+    from app.analysis.transcription import get_transcriber_pool, use_single_replica
+    use_single_replica()
+    get_transcriber_pool().load()
+
+
+def _analyze_file(path: str) -> tuple[AnalysisResult | None, str | None, float]:
+    """Analyze one recording inside a worker: (result, error, processing seconds)."""
+    from app.analysis.pipeline import run_analysis_pipeline
+    from app.analysis.probe import AudioPolicyError, check_audio_policy, probe_audio
+
+    started = time.perf_counter()
+    try:
+        probe = probe_audio(Path(path))
+        check_audio_policy(probe)
+        result = run_analysis_pipeline(Path(path), probe=probe)
+    except AudioPolicyError as e:
+        return None, e.detail, time.perf_counter() - started
+    except Exception as e:
+        return None, f"Analysis failed: {e}", time.perf_counter() - started
+    return result, None, time.perf_counter() - started
+
+
+def config_version() -> str:
+    """Short hash of the settings that change results, stored with each manifest entry."""
+    material = json.dumps(config_fingerprint(), sort_keys=True)
+    return hashlib.sha256(material.encode()).hexdigest()[:16]
+
+
+def find_recordings(root: Path) -> list[Path]:
+    """WAV and MP3 files under `root`, in a stable order."""
+    return sorted(
+        path for path in root.rglob("*")
+        if path.is_file() and path.suffix.lower() in AUDIO_SUFFIXES
+    )
+
+
+def load_manifest(manifest_path: Path) -> dict[str, dict]:
+    """Latest manifest entry per recording (later lines win)."""
+    entries: dict[str, dict] = {}
+    if manifest_path.exists():
+        with open(manifest_path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line cut short by an interrupted run
+                    continue
+                entries[entry["path"]] = entry
+    return entries
+
+
+def _require_pyarrow() -> None:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        sys.exit("Parquet output requires pyarrow (pip install pyarrow), or use a .csv output")
+
+
+def write_output(output_path: Path, rows: list[dict]) -> None:
+    """Write result rows as Parquet or CSV, chosen by the output suffix."""
+    if output_path.suffix.lower() == ".parquet":
+        _require_pyarrow()
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        pq.write_table(pa.Table.from_pylist(rows), output_path)
+        return
+
+    columns = list(rows[0]) if rows else ["path"]
+    with open(output_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({
+                column: json.dumps(value) if isinstance(value, list) else value
+                for column, value in row.items()
+            })
+
+
+async def run(args: argparse.Namespace) -> int:
+    root = args.directory.resolve()
+    manifest_path = args.manifest or args.output.with_name(args.output.name + ".manifest.jsonl")
+    manifest = load_manifest(manifest_path)
+    config = config_version()
+    skip = {"completed"} | (set() if args.retry_failed else {"failed"})
+
+    def done(path: Path) -> bool:
+        entry = manifest.get(str(path.relative_to(root)), {})
+        return entry.get("config") == config and entry.get("status") in skip
+
+    recordings = find_recordings(root)
+    pending = [path for path in recordings if not done(path)]
+    print(f"{len(recordings)} recordings, {len(recordings) - len(pending)} already done, {len(pending)} to analyze")
+
+    writer = None
+    if args.save_to_db and pending:
+        from app.db_writer import get_result_writer
+        writer = get_result_writer()
+        writer.start()
+
+    workers = max(1, min(args.workers, len(pending) or 1))
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(max(1, (os.cpu_count() or 1) // workers),)
+    )
+
+    loop = asyncio.get_running_loop()
+
+    async def analyze(path: Path) -> tuple[Path, AnalysisResult | None, str | None, float]:
+        return path, *await loop.run_in_executor(pool, _analyze_file, str(path))
+
+    started = time.perf_counter()
+    completed = failed = 0
+    audio_seconds = processing_seconds = 0.0
+    tasks = [asyncio.create_task(analyze(path)) for path in pending]
+
+    try:
+        with open(manifest_path, "a") as manifest_file:
+            for next_done in asyncio.as_completed(tasks):
+                path, result, error, seconds = await next_done
+                relative = str(path.relative_to(root))
+                processing_seconds += seconds
+
+                if result is None:
+                    failed += 1
+                    entry = {
+                        "path": relative,
+                        "status": "failed",
+                        "config": config,
+                        "error": error,
+                        "seconds": round(seconds, 3),
+                    }
+                else:
+                    completed += 1
+                    audio_seconds += result.audio_duration
+                    entry = {
+                        "path": relative,
+                        "status": "completed",
+                        "config": config,
+                        "seconds": round(seconds, 3),
+                        "record": analysis_record(result),
+                    }
+                    if writer is not None:
+                        writer.submit(result)
+
+                manifest_file.write(json.dumps(entry) + "\n")
+                manifest_file.flush()
+                manifest[relative] = entry
+
+                elapsed = time.perf_counter() - started
+                finished = completed + failed
+                outcome = "ok" if result is not None else f"FAILED ({error})"
+                print(f"[{finished}/{len(pending)}] {relative}: {outcome} in {seconds:.1f}s | {finished / elapsed * 60:.1f} files/min")
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("Interrupted; progress is saved in the manifest")
+    finally:
+        for task in tasks:
+            task.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
+        if writer is not None:
+            await writer.stop()
+            await SupabaseClient.close()
+
+    elapsed = time.perf_counter() - started
+    if completed + failed:
+        print(
+            f"Analyzed {completed + failed} files ({failed} failed) in {elapsed:.1f}s: "
+            f"{(completed + failed) / elapsed * 60:.1f} files/min, "
+            f"RTF {processing_seconds / audio_seconds if audio_seconds else 0.0:.3f} per worker, "
+            f"{audio_seconds / elapsed:.1f}s of audio per second overall"
+        )
+
+    # Results from another configuration that were not re-analyzed (interrupted run) are left out
+    rows = [
+        {"path": entry["path"], **entry["record"]}
+        for entry in manifest.values()
+        if entry["status"] == "completed" and entry.get("config") == config
+    ]
+    write_output(args.output, rows)
+    print(f"Wrote {len(rows)} results to {args.output}")
+    return 1 if failed else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", type=Path, help="Directory searched recursively for WAV/MP3 files")
+    parser.add_argument("--output", type=Path, required=True, help="Results file (.csv or .parquet)")
+    parser.add_argument("--manifest", type=Path, help="Progress manifest (default: OUTPUT.manifest.jsonl)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: all cores)")
+    parser.add_argument("--save-to-db", action="store_true", help="Also save results to the database")
+    parser.add_argument("--retry-failed", action="store_true", help="Re-analyze files that failed in an earlier run")
+    args = parser.parse_args()
+    if args.output.suffix.lower() == ".parquet":
+        # Fail before any analysis rather than after the run
+        _require_pyarrow()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    try:
+        sys.exit(asyncio.run(run(args)))
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Bigkas Backend Benchmarks
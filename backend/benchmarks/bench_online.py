@@ -0,0 +1,66 @@
+"""
+Online Statistics Check
+Compares the chunked pitch and pause statistics with the batch path on local
+recordings, reporting the differences and timing of both.
+
+Usage (from backend/):
+    python -m benchmarks.bench_online AUDIO [AUDIO ...] [--block-seconds 10]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from app.analysis.acoustics import AcousticContext, extract_pitch_features
+from app.analysis.audio import AudioBuffer
+from app.analysis.online import online_pauses, online_pitch_stats
+from app.analysis.pauses import detect_pauses_librosa
+
+# Documented tolerances (see app/analysis/online.py)
+PITCH_TOLERANCE_HZ = 1.0
+PAUSE_TOLERANCE_RATIO = 0.02
+PAUSE_TOLERANCE_SECONDS = 0.05
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio", nargs="+", type=Path, help="Audio files to compare")
+    parser.add_argument("--block-seconds", type=float, default=10.0, help="Online block length")
+    args = parser.parse_args()
+    
+    failures = 0
+    for path in args.audio:
+        audio = AudioBuffer.load(path)
+        
+        start = time.perf_counter()
+        batch_mean, batch_std, _, _ = extract_pitch_features(AcousticContext(audio.to_sound()))
+        batch_pauses = detect_pauses_librosa(audio)
+        batch_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        pitch = online_pitch_stats(audio, args.block_seconds)
+        pauses = online_pauses(audio, args.block_seconds)
+        online_time = time.perf_counter() - start
+        
+        batch_total = float(batch_pauses.durations.sum())
+        online_total = float(pauses.durations.sum())
+        within = (
+            abs(pitch.mean - batch_mean) <= PITCH_TOLERANCE_HZ
+            and abs(pitch.std - batch_std) <= PITCH_TOLERANCE_HZ
+            and abs(online_total - batch_total) <= max(PAUSE_TOLERANCE_RATIO * batch_total, PAUSE_TOLERANCE_SECONDS)
+            and abs(len(pauses) - len(batch_pauses)) <= 1
+        )
+        failures += not within
+        
+        print(f"{path.name} ({audio.duration:.1f}s) {'ok' if within else 'OUT OF TOLERANCE'}")
+        print(f"  pitch mean   batch {batch_mean:8.2f}  online {pitch.mean:8.2f} Hz")
+        print(f"  pitch std    batch {batch_std:8.2f}  online {pitch.std:8.2f} Hz")
+        print(f"  pauses       batch {len(batch_pauses):8d}  online {len(pauses):8d}")
+        print(f"  pause time   batch {batch_total:8.3f}  online {online_total:8.3f} s")
+        print(f"  time         batch {batch_time * 1000:8.1f}  online {online_time * 1000:8.1f} ms")
+    
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
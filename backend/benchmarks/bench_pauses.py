@@ -0,0 +1,100 @@
+"""
+Pause Segmentation Benchmark
+Compares the vectorized segmentation engine against the per-frame loop it replaced.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pauses [--minutes 10] [--repeat 5]
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+
+from app.analysis.pauses import PauseSegment, segment_pauses
+
+HOP_SECONDS = 0.010
+
+
+def _segment_loop(
+    rms_db: np.ndarray,
+    frame_times: np.ndarray,
+    silence_threshold_db: float,
+    min_pause_duration: float
+) -> list[PauseSegment]:
+    """The original frame-by-frame implementation, kept as the reference."""
+    is_silent = rms_db < silence_threshold_db
+    
+    pauses = []
+    in_pause = False
+    pause_start = 0.0
+    
+    for i, (time, silent) in enumerate(zip(frame_times, is_silent)):
+        if silent and not in_pause:
+            in_pause = True
+            pause_start = time
+        elif not silent and in_pause:
+            in_pause = False
+            pause_duration = time - pause_start
+            if pause_duration >= min_pause_duration:
+                pauses.append(PauseSegment(start=pause_start, end=time, duration=pause_duration))
+    
+    if in_pause:
+        final_time = frame_times[-1]
+        pause_duration = final_time - pause_start
+        if pause_duration >= min_pause_duration:
+            pauses.append(PauseSegment(start=pause_start, end=final_time, duration=pause_duration))
+    
+    return pauses
+
+
+def synthetic_levels(minutes: float, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Per-frame dB levels alternating speech bursts and pauses, with noise."""
+    rng = np.random.default_rng(seed)
+    n_frames = int(minutes * 60 / HOP_SECONDS)
+    
+    levels = np.empty(n_frames)
+    i = 0
+    while i < n_frames:
+        speech = int(rng.uniform(0.5, 4.0) / HOP_SECONDS)
+        pause = int(rng.uniform(0.05, 1.5) / HOP_SECONDS)
+        levels[i:i + speech] = rng.normal(-15.0, 6.0, size=len(levels[i:i + speech]))
+        levels[i + speech:i + speech + pause] = rng.normal(-55.0, 6.0, size=len(levels[i + speech:i + speech + pause]))
+        i += speech + pause
+    
+    return levels, np.arange(n_frames) * HOP_SECONDS
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=10.0, help="Length of the synthetic clip")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions (best is reported)")
+    args = parser.parse_args()
+    
+    levels, times = synthetic_levels(args.minutes)
+    threshold, min_pause = -40.0, 0.3
+    
+    reference = _segment_loop(levels, times, threshold, min_pause)
+    vectorized = segment_pauses(levels, times, threshold, min_pause_duration=min_pause)
+    assert len(reference) == len(vectorized), "segment counts differ"
+    assert np.allclose([p.start for p in reference], vectorized.starts)
+    assert np.allclose([p.end for p in reference], vectorized.ends)
+    
+    loop_time = min(timeit.repeat(
+        lambda: _segment_loop(levels, times, threshold, min_pause), number=1, repeat=args.repeat
+    ))
+    vector_time = min(timeit.repeat(
+        lambda: segment_pauses(levels, times, threshold, min_pause_duration=min_pause), number=1, repeat=args.repeat
+    ))
+    hysteresis_time = min(timeit.repeat(
+        lambda: segment_pauses(levels, times, threshold, -35.0, min_pause, merge_gap=0.15), number=1, repeat=args.repeat
+    ))
+    
+    print(f"{len(levels)} frames ({args.minutes:g} min), {len(reference)} pauses")
+    print(f"  loop:                   {loop_time * 1000:8.2f} ms")
+    print(f"  vectorized:             {vector_time * 1000:8.2f} ms  ({loop_time / vector_time:.0f}x)")
+    print(f"  vectorized+hysteresis:  {hysteresis_time * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
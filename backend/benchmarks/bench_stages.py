@@ -0,0 +1,110 @@
+"""
+Analysis Stage Benchmark
+Times acoustics, pauses, fluency, scoring and the whole pipeline (with a fixed
+transcript standing in for Whisper) on synthetic inputs of several lengths,
+and fails when a stage is slower than the stored baseline.
+
+Usage (from backend/):
+    python -m benchmarks.bench_stages [--durations 10 60 600] [--repeat 3]
+        [--tolerance 0.3] [--baseline PATH] [--update-baseline]
+
+Exits 1 if any stage takes more than (1 + tolerance) times its baseline
+(and at least 2 ms longer). Baselines are machine-specific; record them on
+the machine that runs the check with --update-baseline.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+from pathlib import Path
+
+from app.analysis.acoustics import analyze_acoustics
+from app.analysis.fluency import analyze_fluency
+from app.analysis.pauses import analyze_pauses, calculate_speech_duration
+from app.analysis.pipeline import AnalysisPipeline
+from app.analysis.scoring import calculate_confidence_score
+from benchmarks.synthetic import filler_transcript, speech_like
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline_stages.json")
+
+# Differences below this are timer noise, whatever the ratio
+MIN_REGRESSION_SECONDS = 0.002
+
+
+def time_stages(duration: float, repeat: int) -> dict[str, float]:
+    """Best-of-`repeat` seconds for each stage on a synthetic clip of `duration` seconds."""
+    audio, _ = speech_like(duration)
+    transcription = filler_transcript(duration, filler_ratio=0.2)
+
+    # Inputs for the downstream stages, computed once outside the timings
+    audio_metrics = analyze_acoustics(audio)
+    pause_metrics = analyze_pauses(audio, duration)
+    speech_duration = calculate_speech_duration(duration, pause_metrics)
+    fluency_metrics = analyze_fluency(transcription.text, duration, speech_duration)
+
+    stages = {
+        "acoustics": lambda: analyze_acoustics(audio),
+        "pauses": lambda: analyze_pauses(audio, duration),
+        "fluency": lambda: analyze_fluency(transcription.text, duration, speech_duration),
+        "scoring": lambda: calculate_confidence_score(audio_metrics, fluency_metrics, pause_metrics),
+        "pipeline": lambda: AnalysisPipeline().analyze_buffer(audio, transcription=transcription),
+    }
+    return {name: min(timeit.repeat(stage, number=1, repeat=repeat)) for name, stage in stages.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", nargs="+", type=float, default=[10.0, 60.0, 600.0], help="Clip lengths in seconds")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported)")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed slowdown over the baseline (0.3 = 30%%)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Record these timings as the new baseline")
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    recorded = baseline.get("timings", {})
+
+    timings: dict[str, dict[str, float]] = {}
+    regressions = []
+
+    print(f"{'duration':>9} {'stage':<10} {'ms':>10} {'baseline':>10} {'ratio':>6}")
+    for duration in args.durations:
+        key = f"{duration:g}s"
+        timings[key] = time_stages(duration, args.repeat)
+
+        for stage, seconds in timings[key].items():
+            reference = recorded.get(key, {}).get(stage)
+            if reference is None:
+                print(f"{key:>9} {stage:<10} {seconds * 1000:10.3f} {'-':>10} {'-':>6}")
+                continue
+
+            ratio = seconds / reference if reference > 0 else float("inf")
+            regressed = seconds > reference * (1 + args.tolerance) and seconds - reference > MIN_REGRESSION_SECONDS
+            if regressed:
+                regressions.append(f"{stage} at {key}: {seconds:.4f}s vs {reference:.4f}s baseline ({ratio:.2f}x)")
+            print(f"{key:>9} {stage:<10} {seconds * 1000:10.3f} {reference * 1000:10.3f} {ratio:5.2f}x{'  REGRESSED' if regressed else ''}")
+
+    if args.update_baseline:
+        merged = {**recorded, **timings}
+        args.baseline.write_text(json.dumps({
+            "machine": f"{platform.machine()} {platform.processor() or platform.system()}, Python {platform.python_version()}",
+            "repeat": args.repeat,
+            "timings": {key: {stage: round(seconds, 6) for stage, seconds in stages.items()} for key, stages in merged.items()},
+        }, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) slower than baseline (tolerance {args.tolerance:.0%}):")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+    if recorded:
+        print(f"\nAll stages within {args.tolerance:.0%} of baseline")
+
+
+if __name__ == "__main__":
+    main()
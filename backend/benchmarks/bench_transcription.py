@@ -0,0 +1,90 @@
+"""
+Transcription Backend Benchmark
+Reports real-time factor and word error rate of each transcriber backend,
+using the fp32 "whisper" backend's transcript as the reference.
+
+Usage (from backend/):
+    python -m benchmarks.bench_transcription AUDIO [AUDIO ...] [--model-size base]
+        [--backends whisper whisper-int8]
+
+RTF is processing time divided by audio duration (lower is faster).
+"""
+
+import argparse
+import re
+import time
+from pathlib import Path
+
+from app.analysis.audio import AudioBuffer
+from app.analysis.transcription import available_backends, create_backend
+
+REFERENCE_BACKEND = "whisper"
+
+
+def _words(text: str) -> list[str]:
+    return re.findall(r"[\w']+", text.lower())
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """(substitutions + deletions + insertions) / reference words."""
+    ref, hyp = _words(reference), _words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    
+    # Levenshtein distance over words, one row at a time
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            )
+        previous = current
+    
+    return previous[-1] / len(ref)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio", nargs="+", type=Path, help="Audio files to transcribe")
+    parser.add_argument("--model-size", default="base", help="Whisper model size")
+    parser.add_argument("--backends", nargs="+", default=available_backends(), choices=available_backends())
+    args = parser.parse_args()
+    
+    backends = [REFERENCE_BACKEND] + [name for name in args.backends if name != REFERENCE_BACKEND]
+    clips = [(path.name, AudioBuffer.load(path)) for path in args.audio]
+    total_audio = sum(audio.duration for _, audio in clips)
+    
+    references: dict[str, str] = {}
+    print(f"{len(clips)} clips, {total_audio:.1f}s of audio, model '{args.model_size}'")
+    print(f"{'backend':<16}{'load (s)':>10}{'RTF':>8}{'WER':>8}")
+    
+    for name in backends:
+        backend = create_backend(name, args.model_size)
+        start = time.perf_counter()
+        backend.load()
+        load_time = time.perf_counter() - start
+        
+        # Untimed warm-up so one-off allocations don't count against the first clip
+        backend.transcribe(clips[0][1].for_whisper()[:16000])
+        
+        elapsed = 0.0
+        errors = []
+        for clip_name, audio in clips:
+            samples = audio.for_whisper()
+            start = time.perf_counter()
+            text = backend.transcribe(samples)["text"]
+            elapsed += time.perf_counter() - start
+            
+            if name == REFERENCE_BACKEND:
+                references[clip_name] = text
+            errors.append(word_error_rate(references[clip_name], text))
+        
+        wer = sum(errors) / len(errors)
+        print(f"{name:<16}{load_time:>10.2f}{elapsed / total_audio:>8.3f}{wer:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
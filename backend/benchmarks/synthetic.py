@@ -0,0 +1,152 @@
+"""
+Synthetic Benchmark Inputs
+Deterministic audio and transcripts for timing the analysis stages without recordings or Whisper.
+
+Every generator takes a seed, so the same arguments always produce the same input.
+"""
+
+import numpy as np
+
+from app.analysis.audio import AudioBuffer
+from app.analysis.transcription import TranscriptionResult
+
+SAMPLE_RATE = 16000
+
+# Noise floor for silence gaps, well below the -40 dB pause threshold
+SILENCE_LEVEL = 1e-4
+
+_WORDS = (
+    "the", "a", "speech", "today", "we", "will", "talk", "about", "public", "speaking",
+    "confidence", "voice", "audience", "practice", "really", "important", "when", "you",
+    "present", "your", "ideas", "clearly", "and", "with", "energy", "every", "time",
+)
+_FILLERS = ("um", "uh", "ah", "like", "you know", "er", "hmm", "so", "actually", "basically")
+
+
+def voiced_tone(
+    duration: float,
+    f0: float = 120.0,
+    jitter: float = 0.01,
+    shimmer: float = 0.05,
+    harmonics: int = 8,
+    sample_rate: int = SAMPLE_RATE,
+    seed: int = 0
+) -> np.ndarray:
+    """
+    A glottal-like pulse train with controlled period and amplitude perturbation.
+
+    Each period's length is drawn around 1/f0 with relative standard
+    deviation `jitter`, and its amplitude around 1 with relative standard
+    deviation `shimmer`; within a period the waveform is a fixed sum of
+    `harmonics` decaying partials.
+
+    Returns:
+        float32 samples peaking near 0.5.
+    """
+    rng = np.random.default_rng(seed)
+    n_samples = int(duration * sample_rate)
+
+    # Enough periods to cover the duration even when they run short
+    n_periods = int(duration * f0 * 1.5) + 2
+    periods = np.clip(rng.normal(1.0, jitter, n_periods), 0.5, 1.5) / f0
+    amplitudes = np.clip(rng.normal(1.0, shimmer, n_periods), 0.1, 2.0)
+    starts = np.concatenate([[0.0], np.cumsum(periods)[:-1]])
+
+    t = np.arange(n_samples) / sample_rate
+    index = np.searchsorted(starts, t, side="right") - 1
+    phase = (t - starts[index]) / periods[index]
+
+    wave = np.zeros(n_samples)
+    for k in range(1, harmonics + 1):
+        wave += np.sin(2 * np.pi * k * phase) / k
+    wave *= amplitudes[index]
+    return (0.5 * wave / np.abs(wave).max()).astype(np.float32)
+
+
+def speech_like(
+    duration: float,
+    speech_range: tuple[float, float] = (0.8, 4.0),
+    gap_range: tuple[float, float] = (0.15, 1.2),
+    sample_rate: int = SAMPLE_RATE,
+    seed: int = 0
+) -> tuple[AudioBuffer, list[tuple[float, float]]]:
+    """
+    Voiced bursts separated by near-silent gaps.
+
+    Bursts are `voiced_tone`s with a randomly chosen pitch (90-220 Hz),
+    jitter and shimmer, plus a little breath noise; gaps are low-level
+    noise. Burst and gap lengths are drawn uniformly from the given ranges.
+
+    Returns:
+        The audio and the (start, end) times of every gap.
+    """
+    rng = np.random.default_rng(seed)
+    n_samples = int(duration * sample_rate)
+    samples = rng.normal(0.0, SILENCE_LEVEL, n_samples).astype(np.float32)
+
+    gaps = []
+    position = 0
+    while position < n_samples:
+        burst = int(rng.uniform(*speech_range) * sample_rate)
+        end = min(position + burst, n_samples)
+        tone = voiced_tone(
+            (end - position) / sample_rate + 1 / sample_rate,
+            f0=rng.uniform(90.0, 220.0),
+            jitter=rng.uniform(0.005, 0.02),
+            shimmer=rng.uniform(0.02, 0.08),
+            sample_rate=sample_rate,
+            seed=int(rng.integers(1 << 31))
+        )[:end - position]
+        samples[position:end] += tone + rng.normal(0.0, 0.01, end - position).astype(np.float32)
+        position = end
+
+        gap = int(rng.uniform(*gap_range) * sample_rate)
+        if position < n_samples:
+            gaps.append((position / sample_rate, min(position + gap, n_samples) / sample_rate))
+        position += gap
+
+    return AudioBuffer(samples, sample_rate), gaps
+
+
+def filler_transcript(
+    duration: float,
+    words_per_minute: float = 150.0,
+    filler_ratio: float = 0.15,
+    seed: int = 0
+) -> TranscriptionResult:
+    """
+    A transcript of the length a speaker would produce in `duration` seconds.
+
+    About `filler_ratio` of the tokens are filler words (including the
+    multi-word "you know"). Segments of ten words carry evenly spaced
+    word timestamps, like Whisper output with `word_timestamps=True`.
+    """
+    rng = np.random.default_rng(seed)
+    n_words = max(int(duration / 60 * words_per_minute), 1)
+    tokens = [
+        str(rng.choice(_FILLERS)) if rng.random() < filler_ratio else str(rng.choice(_WORDS))
+        for _ in range(n_words)
+    ]
+
+    step = duration / n_words
+    segments = []
+    for first in range(0, n_words, 10):
+        chunk = tokens[first:first + 10]
+        words = [
+            {"word": f" {token}", "start": (first + i) * step, "end": (first + i + 0.8) * step, "probability": 0.9}
+            for i, token in enumerate(chunk)
+        ]
+        segments.append({
+            "id": len(segments),
+            "start": words[0]["start"],
+            "end": words[-1]["end"],
+            "text": " " + " ".join(chunk),
+            "words": words,
+        })
+
+    return TranscriptionResult(
+        text=" ".join(tokens),
+        segments=segments,
+        language="en",
+        duration=duration
+    )
@@ -6,32 +6,63 @@ This API receives audio files, analyzes them using signal processing
 and machine learning, and stores the results in Supabase.
 """
 
+import asyncio
+import hmac
+import json
 import logging
 import os
-import tempfile
+import zipfile
 from contextlib import asynccontextmanager
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 from pathlib import Path
-from typing import Annotated
-from uuid import UUID
+from typing import Annotated, AsyncIterator, Literal
+from uuid import UUID, uuid4
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, status, Query
+from fastapi import FastAPI, File, Header, UploadFile, HTTPException, status, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 
 from app.config import get_settings
 from app.models import (
+    AnalysisPage,
     AnalysisResult,
     HealthResponse,
     ErrorResponse,
+    JobStatus,
 )
 from app.database import (
-    insert_analysis_result,
+    SupabaseClient,
     get_analysis_by_session,
-    check_connection,
+    get_health_probe,
+    get_record_cache,
+    list_analyses,
+)
+from app.analysis.probe import AudioPolicyError, probe_audio, check_audio_policy
+from app.analysis.streaming import StreamingAnalyzer
+from app.analysis.transcription import get_transcriber_pool
+from app.cache import cache_key, get_result_cache
+from app.db_writer import get_result_writer
+from app.executor import PipelineBusyError, get_pipeline_executor
+from app.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, get_metrics
+from app.profiling import get_profile_store
+from app.jobs import (
+    Job,
+    JobFailedError,
+    JobState,
+    get_job_dispatcher,
+    get_job_store,
+    save_analysis_result,
+)
+from app.uploads import (
+    MULTIPART_OVERHEAD_BYTES,
+    BatchEntry,
+    SpooledUpload,
+    UploadLimitMiddleware,
+    UploadTooLargeError,
+    extract_audio_archive,
+    spool_upload,
 )
-from app.analysis.pipeline import run_analysis_pipeline
-from app.analysis.transcription import WhisperTranscriber
 
 # Configure logging
 logging.basicConfig(
@@ -45,31 +76,38 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """
     Application lifespan handler.
-    Pre-loads Whisper model on startup.
+    
+    Starts everything in the background so the server accepts connections
+    right away: the pipeline executor loads Whisper and warms up (reported
+    by /health/ready), and the database probe checks the connection
+    concurrently.
     """
     logger.info("Starting Bigkas Backend...")
     
-    # Pre-load Whisper model
-    try:
-        logger.info("Pre-loading Whisper model...")
-        WhisperTranscriber.get_model()
-        logger.info("Whisper model loaded successfully")
-    except Exception as e:
-        logger.error(f"Failed to load Whisper model: {e}")
+    # Load Whisper and run a warm-up analysis wherever jobs will run
+    executor = get_pipeline_executor()
+    executor.start()
     
-    # Check Supabase connection
-    try:
-        connected = await check_connection()
-        if connected:
-            logger.info("Supabase connection verified")
-        else:
-            logger.warning("Supabase connection could not be verified")
-    except Exception as e:
-        logger.error(f"Supabase connection error: {e}")
+    # The first connection check runs in the background, then keeps repeating
+    probe = get_health_probe()
+    probe.start()
+    
+    # Write results to the database in the background, replaying any spooled ones
+    writer = get_result_writer()
+    writer.start()
+    
+    # Resume queued jobs and start dispatching
+    dispatcher = get_job_dispatcher()
+    await dispatcher.start()
     
     yield
     
     logger.info("Shutting down Bigkas Backend...")
+    await dispatcher.stop()
+    await writer.stop()
+    await probe.stop()
+    await SupabaseClient.close()
+    executor.shutdown()
 
 
 # Initialize FastAPI app
@@ -83,6 +121,14 @@ app = FastAPI(
     }
 )
 
+# Reject oversized uploads while they arrive instead of after buffering
+# (added before CORS so the 413 still carries CORS headers)
+app.add_middleware(
+    UploadLimitMiddleware,
+    max_body_bytes=get_settings().max_upload_bytes + MULTIPART_OVERHEAD_BYTES,
+    path_limits={"/analyze-batch": get_settings().batch_max_upload_bytes}
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -92,6 +138,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Count requests and track how many are in flight
+app.add_middleware(MetricsMiddleware, metrics=get_metrics())
+
 
 @app.get("/", tags=["Root"])
 async def root():
@@ -110,18 +159,221 @@ async def health_check():
     """
     Health check endpoint.
     
-    Returns the status of the API and its dependencies.
+    Returns the status of the API and its dependencies. The database
+    status comes from the background probe and is never checked inline.
     """
-    supabase_connected = await check_connection()
-    
     return HealthResponse(
         status="healthy",
         timestamp=datetime.utcnow(),
-        whisper_model_loaded=WhisperTranscriber.is_loaded(),
-        supabase_connected=supabase_connected
+        whisper_model_loaded=get_pipeline_executor().model_loaded(),
+        supabase_connected=get_health_probe().connected
+    )
+
+
+@app.get("/health/live", tags=["Health"])
+async def liveness():
+    """
+    Liveness probe.
+    
+    Answers as long as the event loop is responsive; touches no dependencies.
+    """
+    return {"status": "alive"}
+
+
+@app.get("/health/ready", tags=["Health"])
+async def readiness():
+    """
+    Readiness probe.
+    
+    Returns 200 once Whisper is loaded and a warm-up analysis has run
+    wherever jobs run, otherwise 503, along with how long startup took.
+    The cached database status is reported but does not gate readiness:
+    results are spooled locally while the database is unreachable, so
+    the node can keep analyzing audio.
+    """
+    executor = get_pipeline_executor()
+    ready = executor.ready()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "whisper_model_loaded": executor.model_loaded(),
+            "warmed_up": ready,
+            "time_to_ready_seconds": round(executor.time_to_ready, 3) if executor.time_to_ready is not None else None,
+            "database": get_health_probe().status()
+        }
     )
 
 
+@app.get("/stats", tags=["Health"])
+async def stats():
+    """
+    Runtime statistics.
+    
+    Returns pipeline queue depth, job counters, result and record cache
+    hit rates, database write queue depth and flush latency and, when the pipeline
+    runs in this process, transcriber replica utilization.
+    """
+    return await _component_stats()
+
+
+async def _component_stats() -> dict:
+    """Statistics from each component, shared by /stats and /metrics."""
+    executor = get_pipeline_executor()
+    stats = {
+        "pipeline": executor.stats(),
+        "jobs": await asyncio.to_thread(get_job_dispatcher().stats),
+        "cache": get_result_cache().stats(),
+        "record_cache": get_record_cache().stats(),
+        "db_writer": await asyncio.to_thread(get_result_writer().stats)
+    }
+    if not executor.uses_processes:
+        stats["transcriber"] = get_transcriber_pool().stats()
+    return stats
+
+
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Health"])
+async def metrics():
+    """
+    Metrics in the Prometheus text format.
+    
+    Per-stage latency histograms (decode, transcription, acoustics,
+    pauses, fluency, scoring and database writes), queue depths, in-flight
+    requests and jobs, audio seconds processed, cache lookups by result
+    and Whisper model load time.
+    """
+    registry = get_metrics()
+    registry.collect(await _component_stats())
+    return PlainTextResponse(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+def _audio_suffix(audio: UploadFile) -> str:
+    """Validate the upload's content type and return the matching file extension."""
+    settings = get_settings()
+    
+    if audio.content_type not in settings.allowed_audio_types:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unsupported audio format: {audio.content_type}. Allowed: {settings.allowed_audio_types}"
+        )
+    
+    if audio.content_type in ["audio/mpeg", "audio/mp3"]:
+        return ".mp3"
+    return ".wav"
+
+
+def _check_admin(token: str | None) -> None:
+    """
+    Require the configured admin token.
+    
+    Raises:
+        HTTPException: 403 if no admin token is configured or it does not match.
+    """
+    admin_token = get_settings().admin_token
+    if not admin_token or token is None or not hmac.compare_digest(token, admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin token required"
+        )
+
+
+async def _enqueue_upload(audio: UploadFile, save_to_db: bool, profile: bool = False) -> Job:
+    """
+    Spool an upload into the job directory and enqueue it for analysis.
+    
+    Raises:
+        HTTPException: 422 for unsupported or unreadable audio, 413 for oversized
+            uploads or audio longer than allowed, 503 when the queue is full.
+    """
+    settings = get_settings()
+    suffix = _audio_suffix(audio)
+    
+    job_id = uuid4()
+    spool_dir = Path(settings.job_spool_dir)
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    audio_path = spool_dir / f"{job_id}{suffix}"
+    
+    try:
+        upload = await spool_upload(audio, audio_path, settings.max_upload_bytes, settings.upload_chunk_size)
+    except UploadTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    logger.info(f"Received audio file: {audio.filename}, size: {upload.size} bytes")
+    
+    return await _enqueue_spooled(upload, job_id, audio.filename, save_to_db, profile)
+
+
+async def _check_queue_capacity() -> None:
+    """Raise 503 with Retry-After when no more jobs may be queued."""
+    settings = get_settings()
+    if await asyncio.to_thread(get_job_store().count, JobState.QUEUED) >= settings.job_queue_max:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Analysis queue is full, please retry later",
+            headers={"Retry-After": str(settings.pipeline_retry_after_seconds)}
+        )
+
+
+async def _enqueue_spooled(
+    upload: SpooledUpload,
+    job_id: UUID,
+    filename: str | None,
+    save_to_db: bool,
+    profile: bool = False
+) -> Job:
+    """
+    Enqueue audio already spooled into the job directory.
+    
+    Takes ownership of the file: it is removed if the audio is rejected
+    or answered from the result cache (in which case nothing is profiled).
+    Cache hits are answered even when the queue is full.
+    
+    Raises:
+        HTTPException: 422 for unreadable audio, 413 for audio longer than
+            allowed, 503 when the queue is full.
+    """
+    settings = get_settings()
+    store = get_job_store()
+    audio_path = upload.path
+    
+    try:
+        # Preflight: read duration and format from the header and reject
+        # out-of-policy files before any decoding happens (or a cached
+        # result is returned, so acceptance never depends on cache state)
+        probe = await asyncio.to_thread(probe_audio, audio_path)
+        check_audio_policy(probe)
+        
+        # Identical audio analyzed under the same configuration is served from cache
+        key = None
+        if settings.cache_enabled:
+            cache = get_result_cache()
+            key = cache_key(upload.sha256)
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                logger.info(f"Result cache hit for {filename}: session {cached.session_id}")
+                os.remove(audio_path)
+                job = await asyncio.to_thread(store.create_completed, cached, save_to_db)
+                if save_to_db:
+                    save_analysis_result(cached)
+                return job
+        
+        await _check_queue_capacity()
+        
+        job = await asyncio.to_thread(store.create, job_id, audio_path, save_to_db, key, probe, profile)
+    except AudioPolicyError as e:
+        os.remove(audio_path)
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception:
+        if audio_path.exists():
+            os.remove(audio_path)
+        raise
+    
+    get_job_dispatcher().notify()
+    return job
+
+
 @app.post(
     "/analyze-audio",
     response_model=AnalysisResult,
@@ -131,13 +383,16 @@ async def health_check():
         400: {"model": ErrorResponse, "description": "Invalid audio file"},
         413: {"model": ErrorResponse, "description": "File too large"},
         422: {"model": ErrorResponse, "description": "Unsupported audio format"},
-        500: {"model": ErrorResponse, "description": "Analysis failed"}
+        500: {"model": ErrorResponse, "description": "Analysis failed"},
+        503: {"model": ErrorResponse, "description": "Analysis queue is full"}
     }
 )
 async def analyze_audio(
     audio: Annotated[UploadFile, File(description="Audio file (WAV or MP3)")],
-    save_to_db: Annotated[bool, Query(description="Save results to database")] = True
-):
+    save_to_db: Annotated[bool, Query(description="Save results to database")] = True,
+    profile: Annotated[bool, Query(description="Profile this analysis (requires X-Admin-Token)")] = False,
+    x_admin_token: Annotated[str | None, Header()] = None
+) -> AnalysisResult:
     """
     Analyze an audio recording for public speaking confidence metrics.
     
@@ -154,69 +409,392 @@ async def analyze_audio(
     **Maximum Duration**: 10 minutes
     
     Returns a complete analysis with all metrics and a confidence score (0-100).
+    
+    With `profile=true` the run is profiled; fetch the profile from
+    `GET /debug/profiles/{session_id}`.
+    """
+    if profile:
+        _check_admin(x_admin_token)
+    job = await _enqueue_upload(audio, save_to_db, profile)
+    
+    # Thin wrapper over the job queue: wait for this job to finish
+    try:
+        return await get_job_dispatcher().wait_for(job.job_id)
+    except JobFailedError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+ZIP_CONTENT_TYPES = ("application/zip", "application/x-zip-compressed")
+
+
+def _is_archive(audio: UploadFile) -> bool:
+    return audio.content_type in ZIP_CONTENT_TYPES or (audio.filename or "").lower().endswith(".zip")
+
+
+async def _spool_batch(files: list[UploadFile]) -> list[BatchEntry]:
+    """
+    Spool every recording in a batch upload into the job directory.
+    
+    Zip archives are expanded into their audio files. Problems with a
+    single file are recorded on its entry instead of failing the batch.
+    
+    Raises:
+        HTTPException: 413 if the batch holds more than `batch_max_files` recordings.
     """
     settings = get_settings()
+    spool_dir = Path(settings.job_spool_dir)
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    entries: list[BatchEntry] = []
     
-    # Validate content type
-    if audio.content_type not in settings.allowed_audio_types:
+    try:
+        for audio in files:
+            if _is_archive(audio):
+                archive_path = spool_dir / f"{uuid4()}.zip"
+                try:
+                    await spool_upload(audio, archive_path, settings.batch_max_upload_bytes, settings.upload_chunk_size)
+                    entries += await asyncio.to_thread(
+                        extract_audio_archive,
+                        archive_path,
+                        spool_dir,
+                        settings.batch_max_files,
+                        settings.max_upload_bytes,
+                        settings.upload_chunk_size
+                    )
+                except zipfile.BadZipFile:
+                    entries.append(BatchEntry(audio.filename, None, "Not a valid zip archive"))
+                finally:
+                    archive_path.unlink(missing_ok=True)
+                continue
+            
+            try:
+                suffix = _audio_suffix(audio)
+                audio_path = spool_dir / f"{uuid4()}{suffix}"
+                upload = await spool_upload(audio, audio_path, settings.max_upload_bytes, settings.upload_chunk_size)
+            except HTTPException as e:
+                entries.append(BatchEntry(audio.filename, None, e.detail, e.status_code))
+                continue
+            except UploadTooLargeError as e:
+                entries.append(BatchEntry(audio.filename, None, str(e), status.HTTP_413_REQUEST_ENTITY_TOO_LARGE))
+                continue
+            entries.append(BatchEntry(audio.filename, upload))
+        
+        if len(entries) > settings.batch_max_files:
+            raise ValueError(f"Batch holds {len(entries)} recordings; at most {settings.batch_max_files} are allowed")
+    except BaseException as e:
+        for entry in entries:
+            if entry.upload is not None:
+                entry.upload.path.unlink(missing_ok=True)
+        # Too many recordings, in total or in one archive
+        if isinstance(e, ValueError):
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+        raise
+    
+    return entries
+
+
+async def _analyze_batch_entry(
+    index: int,
+    entry: BatchEntry,
+    save_to_db: bool,
+    semaphore: asyncio.Semaphore
+) -> dict:
+    """Analyze one batch recording, returning its NDJSON line as a dict."""
+    line = {"index": index, "filename": entry.name}
+    if entry.upload is None:
+        return {**line, "status": "failed", "status_code": entry.status_code, "detail": entry.error}
+    
+    enqueued = False
+    try:
+        async with semaphore:
+            enqueued = True
+            job = await _enqueue_spooled(entry.upload, UUID(entry.upload.path.stem), entry.name, save_to_db)
+            result = await get_job_dispatcher().wait_for(job.job_id)
+    except (HTTPException, JobFailedError) as e:
+        return {**line, "status": "failed", "status_code": e.status_code, "detail": e.detail}
+    except Exception as e:
+        logger.error(f"Batch analysis of {entry.name} failed: {e}", exc_info=True)
+        return {**line, "status": "failed", "status_code": 500, "detail": f"Analysis failed: {e}"}
+    finally:
+        # Recordings still waiting for a slot when the client goes away are dropped
+        if not enqueued:
+            entry.upload.path.unlink(missing_ok=True)
+    
+    return {**line, "status": "completed", "result": result.model_dump(mode="json")}
+
+
+async def _stream_batch(entries: list[BatchEntry], save_to_db: bool) -> AsyncIterator[bytes]:
+    """Run a batch with bounded concurrency, yielding one NDJSON line per recording as it finishes."""
+    semaphore = asyncio.Semaphore(get_settings().batch_concurrency)
+    tasks = [
+        asyncio.create_task(_analyze_batch_entry(index, entry, save_to_db, semaphore))
+        for index, entry in enumerate(entries)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield (json.dumps(await next_done) + "\n").encode()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+@app.post(
+    "/analyze-batch",
+    tags=["Analysis"],
+    responses={
+        200: {"content": {"application/x-ndjson": {}}, "description": "One JSON line per recording, in completion order"},
+        413: {"model": ErrorResponse, "description": "Too many recordings or request too large"},
+        503: {"model": ErrorResponse, "description": "Analysis queue is full"}
+    }
+)
+async def analyze_batch(
+    files: Annotated[list[UploadFile], File(description="Audio files (WAV or MP3) and/or zip archives of them")],
+    save_to_db: Annotated[bool, Query(description="Save results to database")] = True
+):
+    """
+    Analyze many recordings in one request.
+    
+    Accepts several audio files, zip archives of audio files, or both.
+    Recordings run through the job queue at most `BATCH_CONCURRENCY` at a
+    time, and each result is streamed back as an NDJSON line as soon as it
+    completes:
+    
+    - `{"index", "filename", "status": "completed", "result": {...}}`
+    - `{"index", "filename", "status": "failed", "status_code", "detail"}`
+    
+    A failed recording does not affect the others. Results are saved to
+    the database through the batching background writer.
+    """
+    await _check_queue_capacity()
+    
+    entries = await _spool_batch(files)
+    logger.info(f"Received batch of {len(entries)} recordings")
+    
+    return StreamingResponse(_stream_batch(entries, save_to_db), media_type="application/x-ndjson")
+
+
+@app.post(
+    "/jobs",
+    response_model=JobStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+    tags=["Jobs"],
+    responses={
+        422: {"model": ErrorResponse, "description": "Unsupported audio format"},
+        503: {"model": ErrorResponse, "description": "Analysis queue is full"}
+    }
+)
+async def submit_job(
+    audio: Annotated[UploadFile, File(description="Audio file (WAV or MP3)")],
+    save_to_db: Annotated[bool, Query(description="Save results to database")] = True,
+    profile: Annotated[bool, Query(description="Profile this analysis (requires X-Admin-Token)")] = False,
+    x_admin_token: Annotated[str | None, Header()] = None
+):
+    """
+    Submit an audio recording for asynchronous analysis.
+    
+    Returns immediately with a job ID. Poll `GET /jobs/{job_id}` for progress
+    and fetch the result from `GET /jobs/{job_id}/result` once completed.
+    The job ID is also the session ID of the resulting analysis.
+    """
+    if profile:
+        _check_admin(x_admin_token)
+    job = await _enqueue_upload(audio, save_to_db, profile)
+    return job.to_status()
+
+
+async def _get_job_or_404(job_id: UUID) -> Job:
+    job = await asyncio.to_thread(get_job_store().get, job_id)
+    if job is None:
         raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail=f"Unsupported audio format: {audio.content_type}. Allowed: {settings.allowed_audio_types}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found"
         )
+    return job
+
+
+@app.get(
+    "/jobs/{job_id}",
+    response_model=JobStatus,
+    tags=["Jobs"],
+    responses={
+        404: {"model": ErrorResponse, "description": "Job not found"}
+    }
+)
+async def get_job(job_id: UUID):
+    """
+    Get the state of an analysis job and the pipeline stage it is running.
+    """
+    job = await _get_job_or_404(job_id)
+    return job.to_status()
+
+
+@app.get(
+    "/jobs/{job_id}/result",
+    response_model=AnalysisResult,
+    tags=["Jobs"],
+    responses={
+        404: {"model": ErrorResponse, "description": "Job not found"},
+        409: {"model": ErrorResponse, "description": "Job not finished yet"}
+    }
+)
+async def get_job_result(job_id: UUID):
+    """
+    Fetch the analysis result of a completed job.
     
-    # Determine file extension
-    if audio.content_type in ["audio/mpeg", "audio/mp3"]:
-        suffix = ".mp3"
-    else:
-        suffix = ".wav"
+    Returns 409 while the job is still queued or running. A failed job
+    returns the status code it failed with.
+    """
+    job = await _get_job_or_404(job_id)
     
-    temp_path: Path | None = None
+    if job.state == JobState.COMPLETED:
+        return job.get_result()
+    if job.state == JobState.FAILED:
+        raise HTTPException(status_code=job.error_status or 500, detail=job.error)
     
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Job {job_id} is {job.state}"
+    )
+
+
+@app.websocket("/ws/analyze")
+async def analyze_stream(
+    websocket: WebSocket,
+    sample_rate: Annotated[int, Query(ge=8000, le=48000, description="PCM sample rate in Hz")] = 16000,
+    save_to_db: Annotated[bool, Query(description="Save results to database")] = True
+):
+    """
+    Analyze speech while it is being recorded.
+    
+    The client sends binary messages of 16-bit little-endian mono PCM and a
+    text message `{"type": "end"}` when recording stops. The server pushes
+    `{"type": "interim", "metrics": ...}` about once a second and, after
+    `end`, `{"type": "result", "result": ...}` with the full AnalysisResult.
+    Errors are sent as `{"type": "error", "status_code": ..., "detail": ...}`
+    before the socket is closed; a 503 error also carries `retry_after`.
+
+    Window transcription and the final analysis run on the pipeline
+    executor and count against its queue: a stream is refused with a 503
+    when the queue is full on connect, and a window that cannot be
+    admitted is left for the final analysis instead.
+    """
+    settings = get_settings()
+    executor = get_pipeline_executor()
+    await websocket.accept()
+    
+    if not executor.has_capacity():
+        await websocket.send_json({
+            "type": "error",
+            "status_code": 503,
+            "detail": "Analysis queue is full, retry later",
+            "retry_after": executor.retry_after_seconds
+        })
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+    
+    analyzer = StreamingAnalyzer(
+        sample_rate,
+        max_duration=settings.max_audio_duration_seconds,
+        window_seconds=settings.stream_window_seconds,
+        session_id=uuid4()
+    )
+    transcribing: asyncio.Task | None = None
+    
+    async def transcribe_window():
+        window = await asyncio.to_thread(analyzer.next_window)
+        if window is None:
+            return
+        start, end, samples = window
+        try:
+            result = await executor.transcribe_window(samples, sample_rate)
+        except PipelineBusyError:
+            # The window is transcribed with the tail after `end`
+            return
+        analyzer.add_window(start, end, result)
+    
+    async def push_interim():
+        while True:
+            await asyncio.sleep(settings.stream_interim_interval_seconds)
+            metrics = await asyncio.to_thread(analyzer.interim)
+            await websocket.send_json({"type": "interim", "metrics": metrics.model_dump()})
+    
+    pusher = asyncio.create_task(push_interim(), name="stream-interim")
     try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
-            content = await audio.read()
-            temp_file.write(content)
-            temp_path = Path(temp_file.name)
-        
-        logger.info(f"Received audio file: {audio.filename}, size: {len(content)} bytes")
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                logger.info("Stream closed by client before end of recording")
+                return
+            
+            if message.get("bytes"):
+                await asyncio.to_thread(analyzer.feed, message["bytes"])
+                # Transcribe completed windows in the background while audio keeps arriving
+                if (transcribing is None or transcribing.done()) and analyzer.window_ready():
+                    if transcribing is not None:
+                        transcribing.result()
+                    transcribing = asyncio.create_task(transcribe_window(), name="stream-window")
+            elif message.get("text") and json.loads(message["text"]).get("type") == "end":
+                break
         
-        # Run analysis pipeline
-        result = await run_analysis_pipeline(temp_path)
+        pusher.cancel()
+        if transcribing is not None:
+            await transcribing
         
-        # Validate duration
-        if result.audio_duration > settings.max_audio_duration_seconds:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"Audio duration ({result.audio_duration:.1f}s) exceeds maximum allowed ({settings.max_audio_duration_seconds}s)"
-            )
-        
-        # Save to database if requested
+        samples, windows, window_results = analyzer.final_inputs()
+        result = await executor.analyze_stream(
+            samples, sample_rate, windows, window_results, analyzer.session_id
+        )
         if save_to_db:
-            try:
-                await insert_analysis_result(result)
-                logger.info(f"Analysis result saved to database: {result.session_id}")
-            except Exception as e:
-                logger.error(f"Failed to save to database: {e}")
-                # Don't fail the request, just log the error
-        
-        return result
+            save_analysis_result(result)
         
-    except HTTPException:
-        raise
+        await websocket.send_json({"type": "result", "result": result.model_dump(mode="json")})
+        await websocket.close()
+    except PipelineBusyError as e:
+        await websocket.send_json({
+            "type": "error",
+            "status_code": 503,
+            "detail": "Analysis queue is full, retry later",
+            "retry_after": e.retry_after
+        })
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+    except AudioPolicyError as e:
+        await websocket.send_json({"type": "error", "status_code": e.status_code, "detail": e.detail})
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+    except WebSocketDisconnect:
+        logger.info("Stream client disconnected")
     except Exception as e:
-        logger.error(f"Analysis failed: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Analysis failed: {str(e)}"
-        )
+        logger.error(f"Streaming analysis failed: {e}")
+        await websocket.send_json({"type": "error", "status_code": 500, "detail": str(e)})
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
     finally:
-        # Clean up temporary file
-        if temp_path and temp_path.exists():
-            try:
-                os.remove(temp_path)
-            except Exception as e:
-                logger.warning(f"Failed to clean up temp file: {e}")
+        # Collect the background tasks so their failures are logged, not left unretrieved
+        tasks = [task for task in (pusher, transcribing) if task is not None]
+        for task in tasks:
+            task.cancel()
+        for task, outcome in zip(tasks, await asyncio.gather(*tasks, return_exceptions=True)):
+            if isinstance(outcome, Exception):
+                logger.warning(f"Streaming task {task.get_name()} failed: {outcome}")
+
+
+def _analysis_etag(session_id: UUID) -> str:
+    """Validator for a stored analysis; records never change once written."""
+    return f'W/"{session_id}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def _last_modified(record: dict) -> datetime | None:
+    """A record's analysis time as an aware UTC datetime."""
+    try:
+        analyzed_at = datetime.fromisoformat(str(record["analyzed_at"]))
+    except (KeyError, ValueError):
+        return None
+    if analyzed_at.tzinfo is None:
+        analyzed_at = analyzed_at.replace(tzinfo=timezone.utc)
+    return analyzed_at.astimezone(timezone.utc)
 
 
 @app.get(
@@ -224,19 +802,27 @@ async def analyze_audio(
     response_model=dict,
     tags=["Analysis"],
     responses={
+        304: {"description": "Not modified since the client's copy"},
         404: {"model": ErrorResponse, "description": "Session not found"}
     }
 )
-async def get_analysis(session_id: UUID):
+async def get_analysis(session_id: UUID, request: Request):
     """
     Retrieve a previous analysis result by session ID.
     
+    Responses carry ETag and Last-Modified, and matching If-None-Match or
+    If-Modified-Since requests are answered with 304. The record is
+    always looked up first (usually from the record cache), so a deleted
+    or never-stored session is a 404 even for `If-None-Match: *`.
+    
     Args:
         session_id: The UUID of the analysis session to retrieve.
         
     Returns:
         The stored analysis record.
     """
+    headers = {"ETag": _analysis_etag(session_id), "Cache-Control": "no-cache"}
+    
     try:
         result = await get_analysis_by_session(session_id)
         
@@ -246,8 +832,6 @@ async def get_analysis(session_id: UUID):
                 detail=f"Analysis session {session_id} not found"
             )
         
-        return result
-        
     except HTTPException:
         raise
     except Exception as e:
@@ -256,6 +840,132 @@ async def get_analysis(session_id: UUID):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve analysis: {str(e)}"
         )
+    
+    last_modified = _last_modified(result)
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    if last_modified is not None:
+        # If-None-Match takes precedence when both are sent
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and not if_none_match:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                since = None
+            if since is not None and since.tzinfo is not None and last_modified.replace(microsecond=0) <= since:
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return JSONResponse(content=result, headers=headers)
+
+
+async def _ndjson_records(records: list[dict], cursor: str | None, **filters) -> AsyncIterator[bytes]:
+    """Yield records as NDJSON lines, fetching further pages until the listing is exhausted."""
+    while True:
+        for record in records:
+            yield (json.dumps(record) + "\n").encode()
+        if cursor is None:
+            return
+        try:
+            records, cursor = await list_analyses(cursor=cursor, **filters)
+        except Exception as e:
+            # Headers are already sent, so the export just ends early
+            logger.error(f"Analysis export stopped early: {e}")
+            return
+
+
+@app.get(
+    "/analyses",
+    response_model=AnalysisPage,
+    tags=["Analysis"],
+    responses={
+        200: {"content": {"application/x-ndjson": {}}},
+        422: {"model": ErrorResponse, "description": "Invalid cursor or field name"}
+    }
+)
+async def get_analyses(
+    limit: Annotated[int, Query(ge=1, le=1000, description="Records per page")] = 50,
+    cursor: Annotated[str | None, Query(description="`next_cursor` from the previous page")] = None,
+    since: Annotated[datetime | None, Query(description="Only analyses at or after this time")] = None,
+    until: Annotated[datetime | None, Query(description="Only analyses before this time")] = None,
+    min_score: Annotated[float | None, Query(ge=0, le=100, description="Minimum confidence score")] = None,
+    max_score: Annotated[float | None, Query(ge=0, le=100, description="Maximum confidence score")] = None,
+    fields: Annotated[str | None, Query(description="Comma-separated columns (default: all but transcription)")] = None,
+    format: Annotated[Literal["json", "ndjson"], Query(description="`ndjson` streams every matching record")] = "json"
+):
+    """
+    List stored analyses, newest first.
+    
+    Pages are keyset-paginated: follow `next_cursor` until it is null.
+    With `format=ndjson` the response streams every matching record
+    (starting at `cursor`, if given) as one JSON object per line,
+    fetched from the database `limit` rows at a time.
+    """
+    filters = {
+        "limit": limit,
+        "since": since,
+        "until": until,
+        "min_score": min_score,
+        "max_score": max_score,
+        "fields": [field.strip() for field in fields.split(",") if field.strip()] if fields else None,
+    }
+    
+    # Fetch the first page up front so bad parameters and database errors get a proper status
+    try:
+        records, next_cursor = await list_analyses(cursor=cursor, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to list analyses: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to list analyses: {str(e)}"
+        )
+    
+    if format == "ndjson":
+        return StreamingResponse(
+            _ndjson_records(records, next_cursor, **filters),
+            media_type="application/x-ndjson"
+        )
+    
+    return AnalysisPage(items=records, next_cursor=next_cursor)
+
+
+@app.get("/debug/profiles", tags=["Debug"])
+async def list_profiles(
+    limit: Annotated[int, Query(ge=1, le=200, description="Profiles to return, newest first")] = 20,
+    x_admin_token: Annotated[str | None, Header()] = None
+):
+    """
+    Recently profiled analyses (admin only).
+    
+    Returns each profile's session ID, why it was taken (`sampled` or
+    `requested`), wall time and per-stage timings.
+    """
+    _check_admin(x_admin_token)
+    return await asyncio.to_thread(get_profile_store().recent, limit)
+
+
+@app.get("/debug/profiles/{session_id}", tags=["Debug"])
+async def get_profile(session_id: UUID, x_admin_token: Annotated[str | None, Header()] = None):
+    """
+    Profile of one analysis (admin only).
+    
+    Returns the functions with the most cumulative time across the
+    pipeline's decode and stage threads, with call counts and own time.
+    """
+    _check_admin(x_admin_token)
+    profile = await asyncio.to_thread(get_profile_store().get, str(session_id))
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No profile for session {session_id}"
+        )
+    return profile
 
 
 @app.exception_handler(Exception)